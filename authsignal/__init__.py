@@ -1,2 +1,85 @@
-from .client import AuthsignalClient
-from .webhook import Webhook
+import importlib
+from typing import TYPE_CHECKING
+
+# Public names are resolved on first access so that, for example, a
+# webhook-only consumer importing Webhook never loads requests or humps.
+_LAZY_ATTRIBUTES = {
+    "AuthsignalClient": "client",
+    "Webhook": "webhook",
+    "BulkResult": "bulk",
+    "WebhookVerifier": "webhook",
+    "InMemoryReplayStore": "webhook",
+    "PayloadTooLargeError": "webhook",
+    "RedisReplayStore": "webhook",
+    "ReplayStore": "webhook",
+    "ReplayedEventError": "webhook",
+    "RateLimiter": "rate_limiter",
+    "TokenBucket": "rate_limiter",
+    "Simulator": "simulator",
+    "ActionDetails": "models",
+    "ActionState": "models",
+    "Authenticator": "models",
+    "EnrollVerifiedAuthenticatorResponse": "models",
+    "QueryUsersResponse": "models",
+    "TrackResponse": "models",
+    "User": "models",
+    "ValidateChallengeResponse": "models",
+}
+
+# Submodules were imported eagerly before the lazy attributes above, so code
+# such as authsignal.client.ApiException after a plain "import authsignal"
+# keeps working by loading them on access too.
+_SUBMODULES = frozenset(
+    (
+        "bulk",
+        "cassette",
+        "client",
+        "models",
+        "rate_limiter",
+        "simulator",
+        "version",
+        "webhook",
+    )
+)
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .bulk import BulkResult
+    from .client import AuthsignalClient
+    from .models import (
+        ActionDetails,
+        ActionState,
+        Authenticator,
+        EnrollVerifiedAuthenticatorResponse,
+        QueryUsersResponse,
+        TrackResponse,
+        User,
+        ValidateChallengeResponse,
+    )
+    from .rate_limiter import RateLimiter, TokenBucket
+    from .simulator import Simulator
+    from .webhook import (
+        InMemoryReplayStore,
+        PayloadTooLargeError,
+        RedisReplayStore,
+        ReplayedEventError,
+        ReplayStore,
+        Webhook,
+        WebhookVerifier,
+    )
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,131 @@
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set
+
+from authsignal.rate_limiter import TokenBucket
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class BulkResult:
+    """The outcome of one item of a bulk operation.
+
+    index is the item's position in the input, so results that complete out of
+    order can be matched back to it.
+    """
+
+    __slots__ = ("index", "item", "result", "error")
+
+    def __init__(self, index: int, item: Any, result: Any = None, error: Optional[Exception] = None):
+        self.index = index
+        self.item = item
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error is not None else "ok"
+        return f"BulkResult(index={self.index}, item={self.item!r}, {outcome})"
+
+
+def _read_checkpoint(path: str) -> Set[int]:
+    completed: Set[int] = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash mid-write is simply redone.
+                continue
+            if entry.get("ok"):
+                completed.add(entry["index"])
+    return completed
+
+
+def run_bulk(
+    operation: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate: Optional[float] = None,
+    checkpoint_path: Optional[str] = None,
+) -> Iterator[BulkResult]:
+    """Runs operation over items on a bounded thread pool, yielding results as they finish.
+
+    Items are pulled from the iterable only as workers free up, so neither the
+    input nor the results are held in memory all at once. Failures are
+    reported on their BulkResult rather than raised.
+    Args:
+        operation: Called with each item.
+        items: Any iterable, including a generator.
+        max_workers: Number of items in flight at once. Defaults to 8.
+        rate: Optional cap on operations per second for this job.
+        checkpoint_path: Optional file recording which items succeeded. When it
+            already exists, those items are skipped, so a job that crashed can
+            be resumed by running it again with the same input.
+
+    Checkpointing gives at-least-once semantics. Every operation that finishes
+    is recorded, including those still running when the caller stops
+    iterating, but an item whose operation completed just before a crash
+    can't be, and runs again on resume. Operations that aren't idempotent may
+    therefore be repeated.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    completed = _read_checkpoint(checkpoint_path) if checkpoint_path else set()
+    bucket = TokenBucket(rate=rate, burst=max_workers) if rate else None
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+
+    def call(item):
+        if bucket is not None:
+            bucket.acquire()
+        return operation(item)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    in_flight: Dict[Future, BulkResult] = {}
+    try:
+        pending = ((index, item) for index, item in enumerate(items) if index not in completed)
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_workers * 2:
+                try:
+                    index, item = next(pending)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(call, item)] = BulkResult(index, item)
+
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = in_flight.pop(future)
+                _complete(result, future, checkpoint)
+                yield result
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=True)
+        if checkpoint is not None:
+            # Items that ran but weren't yielded, because the caller stopped
+            # iterating, are recorded so a resumed job doesn't repeat them.
+            for future, result in in_flight.items():
+                if not future.cancelled():
+                    _complete(result, future, checkpoint)
+            checkpoint.close()
+
+
+def _complete(result: BulkResult, future: Future, checkpoint) -> None:
+    try:
+        result.result = future.result()
+    except Exception as e:
+        result.error = e
+    if checkpoint is not None:
+        checkpoint.write(json.dumps({"index": result.index, "ok": result.ok}) + "\n")
+        checkpoint.flush()
@@ -0,0 +1,133 @@
+import itertools
+import os
+import tempfile
+import threading
+import unittest
+
+from .bulk import run_bulk
+from .client import AuthsignalClient, ApiException
+from .simulator import Simulator
+
+SECRET = "bulk-secret"
+
+
+class TestRunBulk(unittest.TestCase):
+    def test_pulls_items_lazily(self):
+        pulled = []
+
+        def items():
+            for i in itertools.count():
+                pulled.append(i)
+                yield i
+
+        results = run_bulk(lambda i: i * 2, items(), max_workers=2)
+        first = [next(results) for _ in range(3)]
+        results.close()
+
+        self.assertEqual(len(first), 3)
+        self.assertLessEqual(len(pulled), 3 + 2 * 2)
+
+    def test_errors_are_reported_not_raised(self):
+        def operation(i):
+            if i % 2:
+                raise ValueError(f"odd {i}")
+            return i
+
+        results = sorted(run_bulk(operation, range(6)), key=lambda r: r.index)
+
+        self.assertEqual([r.ok for r in results], [True, False] * 3)
+        self.assertEqual(results[2].result, 2)
+        self.assertEqual(str(results[1].error), "odd 1")
+
+    def test_bounded_concurrency(self):
+        lock = threading.Lock()
+        active = [0, 0]
+        # Each operation waits for two others to be running, so workers
+        # overlap for certain and a fourth concurrent one would show up.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def operation(i):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            barrier.wait()
+            with lock:
+                active[0] -= 1
+
+        results = list(run_bulk(operation, range(30), max_workers=3))
+
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(active[1], 3)
+
+    def test_resume_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "job.checkpoint")
+            calls = []
+
+            def operation(i):
+                calls.append(i)
+                if i == 7:
+                    raise ValueError("transient")
+                return i
+
+            results = run_bulk(operation, range(20), max_workers=1, checkpoint_path=checkpoint)
+            for _ in range(10):
+                next(results)
+            results.close()
+
+            calls.clear()
+            resumed = list(run_bulk(lambda i: calls.append(i), range(20), checkpoint_path=checkpoint))
+
+            self.assertIn(7, calls)
+            self.assertEqual(sorted(r.index for r in resumed), sorted(calls))
+            self.assertTrue(set(range(7)).isdisjoint(calls))
+
+    def test_stopping_early_checkpoints_running_items(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "job.checkpoint")
+            release = threading.Event()
+
+            def operation(i):
+                if i:
+                    release.wait(timeout=5)
+                return i
+
+            results = run_bulk(operation, range(3), max_workers=3, checkpoint_path=checkpoint)
+            self.assertEqual(next(results).index, 0)
+            threading.Timer(0.1, release.set).start()
+            results.close()
+
+            calls = []
+            list(run_bulk(calls.append, range(3), checkpoint_path=checkpoint))
+            self.assertEqual(calls, [])
+
+
+class TestClientBulk(unittest.TestCase):
+    def setUp(self):
+        self.simulator = Simulator(api_secret_key=SECRET)
+        serving = self.simulator.serve_in_thread()
+        self.client = AuthsignalClient(SECRET, serving.__enter__())
+        self.addCleanup(serving.__exit__, None, None, None)
+
+    def test_bulk_user_lifecycle(self):
+        operations = ((f"user-{i}", {"email": f"user-{i}@example.com"}) for i in range(30))
+        updated = list(self.client.bulk_update_users(operations, max_workers=4))
+        self.assertTrue(all(r.ok for r in updated))
+        self.assertEqual(len(self.simulator.users), 30)
+
+        enrollments = [(f"user-{i}", {"verificationMethod": "EMAIL_OTP"}) for i in range(10)]
+        enrollments.append(("user-10", {"email": "missing-method@example.com"}))
+        enrolled = sorted(
+            self.client.bulk_enroll_verified_authenticators(enrollments), key=lambda r: r.index
+        )
+        self.assertTrue(all(r.ok for r in enrolled[:10]))
+        self.assertIsInstance(enrolled[10].error, ApiException)
+        self.assertEqual(enrolled[10].error.status_code, 400)
+
+        deleted = list(self.client.bulk_delete_users((f"user-{i}" for i in range(30)), rate=1000))
+        self.assertTrue(all(r.ok for r in deleted))
+        self.assertEqual(self.simulator.users, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""Record and replay API traffic for repeatable benchmarks of the client pipeline.
+
+A RecordingAdapter is a regular HTTPAdapter that also keeps every request and
+response it sends. Saved to a cassette file, those interactions can be served
+back by a ReplayAdapter without any network, so the client's serialization,
+decamelizing and error mapping can be profiled on their own:
+
+    recorder = RecordingAdapter("track.cassette.gz")
+    client = AuthsignalClient(secret, api_url, transport=recorder)
+    client.track("user-1", "signIn")
+    recorder.save()
+
+    client = AuthsignalClient(secret, api_url, transport=ReplayAdapter("track.cassette.gz"))
+
+An adapter instance is shared by every session the client builds, including
+the one rebuilt in a forked child. Pass a factory instead, for example
+functools.partial(ReplayAdapter, "track.cassette.gz"), to give each its own.
+
+Cassettes are JSON lines, gzip compressed when the path ends in .gz. The
+Authorization header is never recorded.
+"""
+
+import base64
+import collections
+import datetime
+import gzip
+import json
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Headers that describe the recorded connection rather than the API response.
+SKIPPED_HEADERS = {"date", "connection", "keep-alive", "set-cookie", "transfer-encoding"}
+
+
+class CassetteMissError(requests.exceptions.ConnectionError):
+    pass
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _body_text(body: Any) -> Optional[str]:
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        return body.decode("utf-8")
+    return body
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests as usual and records each interaction for a cassette."""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.interactions: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs) -> requests.Response:
+        response = super().send(request, **kwargs)
+        interaction = {
+            "method": request.method,
+            "url": request.url,
+            "body": _body_text(request.body),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {
+                k: v for k, v in response.headers.items() if k.lower() not in SKIPPED_HEADERS
+            },
+            "elapsed": response.elapsed.total_seconds(),
+        }
+        try:
+            interaction["content"] = response.content.decode("utf-8")
+        except UnicodeDecodeError:
+            interaction["content_b64"] = base64.b64encode(response.content).decode()
+        with self._lock:
+            self.interactions.append(interaction)
+        return response
+
+    def save(self, path: Optional[str] = None) -> None:
+        with self._lock:
+            interactions = list(self.interactions)
+        with _open(path or self.path, "w") as f:
+            for interaction in interactions:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+
+    def close(self) -> None:
+        super().close()
+        if self.interactions:
+            self.save()
+
+
+class _Recorded:
+    __slots__ = ("status", "reason", "headers", "content", "elapsed")
+
+    def __init__(self, interaction: Dict[str, Any]):
+        self.status = interaction["status"]
+        self.reason = interaction.get("reason")
+        self.headers = CaseInsensitiveDict(interaction.get("headers") or {})
+        if "content_b64" in interaction:
+            self.content = base64.b64decode(interaction["content_b64"])
+        else:
+            self.content = (interaction.get("content") or "").encode("utf-8")
+        self.elapsed = interaction.get("elapsed") or 0.0
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serves responses from a cassette instead of the network.
+
+    Requests are matched on method, URL and body. Repeated identical requests
+    get the recorded responses in order and, with loop, start over once they
+    run out, so a short recording can drive a long benchmark. latency_scale
+    sleeps for that fraction of each recorded round trip; the default of 0
+    replays at memory speed.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 0.0, loop: bool = True):
+        super().__init__()
+        self.latency_scale = latency_scale
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._recorded: Dict[Tuple[str, str, Optional[str]], List[_Recorded]] = {}
+        self._pending: Dict[Tuple[str, str, Optional[str]], Deque[_Recorded]] = {}
+
+        with _open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                interaction = json.loads(line)
+                key = (interaction["method"], interaction["url"], interaction.get("body"))
+                self._recorded.setdefault(key, []).append(_Recorded(interaction))
+        for key, recorded in self._recorded.items():
+            self._pending[key] = collections.deque(recorded)
+
+    def _next(self, key: Tuple[str, str, Optional[str]]) -> _Recorded:
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                raise CassetteMissError(f"No recorded response for {key[0]} {key[1]}")
+            if not pending:
+                if not self.loop:
+                    raise CassetteMissError(f"Recorded responses exhausted for {key[0]} {key[1]}")
+                pending.extend(self._recorded[key])
+            return pending.popleft()
+
+    def send(self, request, **kwargs) -> requests.Response:
+        recorded = self._next((request.method, request.url, _body_text(request.body)))
+        if self.latency_scale > 0 and recorded.elapsed > 0:
+            time.sleep(recorded.elapsed * self.latency_scale)
+
+        response = requests.Response()
+        response.status_code = recorded.status
+        response.reason = recorded.reason
+        response.headers = CaseInsensitiveDict(recorded.headers)
+        response._content = recorded.content
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(seconds=recorded.elapsed)
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,117 @@
+import base64
+import functools
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from .cassette import RecordingAdapter, ReplayAdapter, _open
+from .client import AuthsignalClient, ApiException
+from .simulator import Simulator
+
+SECRET = "cassette-secret"
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "session.cassette.gz")
+
+        simulator = Simulator(api_secret_key=SECRET)
+        with simulator.serve_in_thread() as api_url:
+            self.api_url = api_url
+            recorder = RecordingAdapter(self.path)
+            client = AuthsignalClient(SECRET, api_url, transport=recorder)
+            self.recorded_user = client.update_user("user-1", {"email": "one@example.com"})
+            self.recorded_track = client.track("user-1", "signIn")
+            with self.assertRaises(ApiException):
+                client.get_action("user-1", "signIn", "missing")
+            client.session.close()
+
+    def _replay_client(self, **kwargs):
+        return AuthsignalClient(SECRET, self.api_url, transport=ReplayAdapter(self.path, **kwargs))
+
+    def test_replays_responses_without_network(self):
+        client = self._replay_client()
+
+        self.assertEqual(client.update_user("user-1", {"email": "one@example.com"}), self.recorded_user)
+        for _ in range(3):
+            self.assertEqual(client.track("user-1", "signIn"), self.recorded_track)
+
+    def test_replays_errors(self):
+        client = self._replay_client()
+
+        with self.assertRaises(ApiException) as cm:
+            client.get_action("user-1", "signIn", "missing")
+        self.assertEqual(cm.exception.status_code, 404)
+        self.assertEqual(cm.exception.error_code, "not_found")
+
+    def test_unrecorded_request(self):
+        client = self._replay_client()
+
+        with self.assertRaises(ApiException) as cm:
+            client.get_user("someone-else")
+        self.assertIsNone(cm.exception.status_code)
+
+    def test_exhausted_without_loop(self):
+        client = self._replay_client(loop=False)
+
+        client.track("user-1", "signIn")
+        with self.assertRaises(ApiException):
+            client.track("user-1", "signIn")
+
+    def test_latency_scale(self):
+        adapter = ReplayAdapter(self.path, latency_scale=1.0)
+        for recorded in adapter._recorded.values():
+            for response in recorded:
+                response.elapsed = 0.05
+        client = AuthsignalClient(SECRET, self.api_url, transport=adapter)
+
+        start = time.monotonic()
+        client.track("user-1", "signIn")
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def test_transport_factory_builds_an_adapter_per_session(self):
+        client = AuthsignalClient(
+            SECRET, self.api_url, transport=functools.partial(ReplayAdapter, self.path)
+        )
+        adapter = client.session.get_adapter(self.api_url)
+        self.assertIsInstance(adapter, ReplayAdapter)
+
+        # As in a forked child, where the session is rebuilt on first use.
+        with patch("authsignal.client._fork_generation", -1):
+            rebuilt = client.session.get_adapter(self.api_url)
+            self.assertIsInstance(rebuilt, ReplayAdapter)
+            self.assertIsNot(rebuilt, adapter)
+            self.assertEqual(client.track("user-1", "signIn"), self.recorded_track)
+
+    def test_transport_is_mounted_once(self):
+        recorder = RecordingAdapter(self.path)
+        client = AuthsignalClient(SECRET, self.api_url, transport=recorder)
+        recorder.interactions.append({})
+
+        self.assertEqual(list(client.session.adapters.values()), [recorder])
+        with patch.object(recorder, "save") as save:
+            client.session.close()
+        save.assert_called_once_with()
+
+    def test_pool_settings_rejected_with_transport(self):
+        with self.assertRaises(ValueError):
+            AuthsignalClient(SECRET, self.api_url, transport=ReplayAdapter(self.path), pool_maxsize=4)
+
+    def test_secret_is_not_recorded(self):
+        basic_auth = base64.b64encode(f"{SECRET}:".encode()).decode()
+
+        with _open(self.path, "r") as f:
+            lines = f.readlines()
+
+        self.assertTrue(lines)
+        for line in lines:
+            self.assertNotIn(SECRET, line)
+            self.assertNotIn(basic_auth, line)
+
+
+if __name__ == "__main__":
+    unittest.main()
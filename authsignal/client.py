@@ -1,28 +1,51 @@
 import decimal
+import http.cookiejar
 import json
+import os
+import threading
 import urllib.parse
-from enum import Enum
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import humps
 import requests
-from requests.adapters import HTTPAdapter
-
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from authsignal.bulk import DEFAULT_MAX_WORKERS, BulkResult, run_bulk
+from authsignal.models import (
+    ActionDetails,
+    ActionState,
+    Authenticator,
+    EnrollVerifiedAuthenticatorResponse,
+    QueryUsersResponse,
+    TrackResponse,
+    User,
+    ValidateChallengeResponse,
+)
+from authsignal.rate_limiter import RateLimiter, parse_retry_after
 from authsignal.version import VERSION
 from authsignal.webhook import Webhook
 
 API_BASE_URL = "https://api.authsignal.com/v1"
+DEFAULT_POOL_MAXSIZE = 10
+
+_INVALID_JSON = object()
+
+Transport = Union[BaseAdapter, Callable[[], BaseAdapter]]
+
+# Bumped in the child after every fork so clients inherited from the parent
+# know their connection pool is shared with it and must not be reused.
+_fork_generation = 0
+_session_lock = threading.Lock()
 
 
-class ActionState(Enum):
-    BLOCK = "BLOCK"
-    ALLOW = "ALLOW"
-    CHALLENGE_REQUIRED = "CHALLENGE_REQUIRED"
-    CHALLENGE_FAILED = "CHALLENGE_FAILED"
-    CHALLENGE_SUCCEEDED = "CHALLENGE_SUCCEEDED"
-    REVIEW_REQUIRED = "REVIEW_REQUIRED"
-    REVIEW_FAILED = "REVIEW_FAILED"
-    REVIEW_SUCCEEDED = "REVIEW_SUCCEEDED"
+def _after_fork_in_child():
+    global _fork_generation, _session_lock
+    _fork_generation += 1
+    _session_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
 
 
 class DecimalEncoder(json.JSONEncoder):
@@ -33,12 +56,42 @@ class DecimalEncoder(json.JSONEncoder):
 
 
 class CustomSession(requests.Session):
-    def __init__(self, timeout, api_key):
+    """A requests session configured once and then shared read-only.
+
+    Nothing on the session is mutated per request, and cookies are never
+    stored, so one instance can serve many threads without requests seeing each
+    other's state. Connections are pooled per host up to pool_maxsize; with
+    pool_block the extra threads wait for a free connection instead of opening
+    throwaway ones.
+    """
+
+    def __init__(
+        self,
+        timeout,
+        api_key,
+        rate_limiter: RateLimiter = None,
+        decamelize=True,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        pool_block=False,
+        transport: Transport = None,
+    ):
         super().__init__()
-        self.mount("http://", HTTPAdapter())
-        self.mount("https://", HTTPAdapter())
+        if transport is None:
+            pool_kwargs = {"pool_maxsize": pool_maxsize, "pool_block": pool_block}
+            self.mount("http://", HTTPAdapter(**pool_kwargs))
+            self.mount("https://", HTTPAdapter(**pool_kwargs))
+        else:
+            if not isinstance(transport, BaseAdapter):
+                transport = transport()
+            # Mounted once, under the prefix every URL matches, so close()
+            # closes it (and a RecordingAdapter saves) exactly once.
+            self.adapters.clear()
+            self.mount("", transport)
+        self.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
 
         self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.decamelize = decamelize
         self.auth = requests.auth.HTTPBasicAuth(api_key, "")
         self.headers.update(
             {
@@ -69,55 +122,141 @@ class CustomSession(requests.Session):
     def send(self, request, **kwargs) -> requests.Response:
         kwargs.setdefault("timeout", self.timeout)
         try:
-            response = super().send(request, **kwargs)
-            response.raise_for_status()
-
-            if response.headers.get("Content-Type") == "application/json":
-                data = response.json()
-                decamelized_content = humps.decamelize(data)
-                response.decamelized_content = decamelized_content
-            return response
+            response = self._send_with_rate_limit(request, **kwargs)
         except requests.exceptions.RequestException as e:
-            error_code = None
-            error_description = None
-            status_code = None
-
-            if isinstance(e, requests.exceptions.HTTPError):
-                status_code = e.response.status_code
-                try:
-                    error_data = e.response.json()
-                    error_code = error_data.get("errorCode")
-                    error_description = error_data.get("errorDescription")
-                except (ValueError, AttributeError):
-                    pass
-
-            raise ApiException(error_code, error_description, status_code) from e
+            raise ApiException(None, None, None) from e
+
+        # Status and body are checked directly rather than through
+        # raise_for_status, so an error response is decoded once and raised
+        # without an intermediate HTTPError to catch and chain.
+        status_code = response.status_code
+        if status_code >= 400:
+            raise _api_exception_from_response(response)
+
+        if response.headers.get("Content-Type") == "application/json":
+            try:
+                data = json.loads(response.content)
+            except ValueError:
+                data = _INVALID_JSON
+            # Raised outside the except block so the decode error isn't
+            # chained onto it as __context__.
+            if data is _INVALID_JSON:
+                raise ApiException(None, "Response body is not valid JSON", status_code)
+            response.json_content = data
+            if self.decamelize:
+                response.decamelized_content = humps.decamelize(data)
+        return response
+
+    def _send_with_rate_limit(self, request, **kwargs) -> requests.Response:
+        limiter = self.rate_limiter
+        if limiter is None:
+            return super().send(request, **kwargs)
+
+        bucket = limiter.bucket_for(request.method, request.url)
+        attempt = 0
+        while True:
+            bucket.acquire()
+            response = super().send(request, **kwargs)
+            limiter.observe(bucket, response)
+            if response.status_code != 429 or attempt >= limiter.max_retries:
+                return response
+            attempt += 1
 
 
 class AuthsignalClient(object):
+    typed_responses = False
 
-    def __init__(self, api_secret_key, api_url=API_BASE_URL, timeout=2.0):
+    def __init__(
+        self,
+        api_secret_key,
+        api_url=API_BASE_URL,
+        timeout=2.0,
+        rate_limiter: RateLimiter = None,
+        typed_responses: bool = False,
+        pool_maxsize: Optional[int] = None,
+        pool_block: Optional[bool] = None,
+        transport: Transport = None,
+    ):
         """Initialize the client.
+
+        A client is safe to share between threads and is the recommended way
+        to reuse pooled connections; size pool_maxsize to the number of threads
+        that call it concurrently.
+
         Args:
             api_secret_key: Your Authsignal Secret API key of your tenant
             api_url: Base URL, including scheme and host, for sending events.
                 Defaults to 'https://api.authsignal.com/v1'.
             timeout: Number of seconds to wait before failing request. Defaults
                 to 2 seconds.
+            rate_limiter: Optional RateLimiter used to throttle requests per
+                endpoint class and to queue and resend requests rejected with
+                a 429. Disabled by default.
+            typed_responses: Return the __slots__ based models from
+                authsignal.models instead of decamelized dicts. The models are
+                built directly from the decoded JSON and support dict-style
+                access. Defaults to False.
+            pool_maxsize: Maximum number of pooled connections kept per host.
+                Defaults to 10.
+            pool_block: When every pooled connection is busy, wait for one
+                instead of opening a connection that is discarded afterwards.
+                Defaults to False.
+            transport: Optional requests transport adapter used for every
+                request instead of the default pooled HTTPAdapter, e.g. a
+                RecordingAdapter or ReplayAdapter from authsignal.cassette.
+                Pass a callable returning an adapter, such as the adapter
+                class or a functools.partial of it, to have each session get
+                its own, including the one rebuilt in a forked child. An
+                adapter instance is shared by every session the client
+                builds, so a forked child reuses the parent's adapter and
+                any connections it has pooled. The adapter manages its own
+                pooling, so pool_maxsize and pool_block can't be combined
+                with it.
         """
         _assert_non_empty_string(api_url, "api_url")
         _assert_non_empty_string(api_secret_key, "api_secret_key")
+        if transport is not None and (pool_maxsize is not None or pool_block is not None):
+            raise ValueError("pool_maxsize and pool_block can't be used with a custom transport")
 
         self.api_secret_key = api_secret_key
         self.api_url = api_url
 
-        self.session = CustomSession(timeout=timeout, api_key=api_secret_key)
+        self.typed_responses = typed_responses
+        self._session_kwargs = {
+            "timeout": timeout,
+            "api_key": api_secret_key,
+            "rate_limiter": rate_limiter,
+            "decamelize": not typed_responses,
+            "pool_maxsize": DEFAULT_POOL_MAXSIZE if pool_maxsize is None else pool_maxsize,
+            "pool_block": bool(pool_block),
+            "transport": transport,
+        }
+        self.session = CustomSession(**self._session_kwargs)
         self.version = VERSION
         self.webhook = Webhook(api_secret_key=api_secret_key)
 
+    @property
+    def session(self) -> CustomSession:
+        """The HTTP session, rebuilt lazily in a forked child process.
+
+        Pooled connections inherited across a fork share their sockets and TLS
+        state with the parent, so the child drops them without closing and
+        opens its own on first use.
+        """
+        if self._session_generation != _fork_generation:
+            with _session_lock:
+                if self._session_generation != _fork_generation:
+                    self.session = CustomSession(**self._session_kwargs)
+        return self._session
+
+    @session.setter
+    def session(self, session: CustomSession) -> None:
+        self._session = session
+        self._session_generation = _fork_generation
+
     def track(
         self, user_id: str, action: str, attributes: Dict[str, Any] = None
-    ) -> Dict[str, Any]:
+    ) -> Union[Dict[str, Any], TrackResponse]:
         """Tracks an action to authsignal, scoped to the user_id and action
         Returns the status of the action so that you can determine to whether to continue
         Args:
@@ -136,9 +275,9 @@ class AuthsignalClient(object):
             url=path, data=json.dumps(attributes, cls=DecimalEncoder)
         )
 
-        return response.decamelized_content
+        return self._response(response, TrackResponse)
 
-    def get_user(self, user_id: str) -> Dict[str, Any]:
+    def get_user(self, user_id: str) -> Union[Dict[str, Any], User]:
         """Retrieves the user from authsignal
         Args:
             user_id:  A user's id.
@@ -149,9 +288,11 @@ class AuthsignalClient(object):
 
         response = self.session.get(url=path)
 
-        return response.decamelized_content
+        return self._response(response, User)
 
-    def update_user(self, user_id: str, attributes: Dict[str, Any]) -> Dict[str, Any]:
+    def update_user(
+        self, user_id: str, attributes: Dict[str, Any]
+    ) -> Union[Dict[str, Any], User]:
         """Updates the user in authsignal
         Args:
             user_id:  A user's id.
@@ -166,7 +307,7 @@ class AuthsignalClient(object):
             url=path, data=json.dumps(attributes, cls=DecimalEncoder)
         )
 
-        return response.decamelized_content
+        return self._response(response, User)
 
     def delete_user(self, user_id: str):
         """Deletes a user from authsignal
@@ -189,7 +330,7 @@ class AuthsignalClient(object):
         token: str = None,
         limit: int = None,
         last_evaluated_user_id: str = None,
-    ) -> Dict[str, Any]:
+    ) -> Union[Dict[str, Any], QueryUsersResponse]:
         """Queries users from authsignal with optional filters
         Args:
             username: Filter by username. Optional.
@@ -221,9 +362,11 @@ class AuthsignalClient(object):
 
         response = self.session.get(url=path)
 
-        return response.decamelized_content
+        return self._response(response, QueryUsersResponse)
 
-    def get_authenticators(self, user_id: str) -> Dict[str, Any]:
+    def get_authenticators(
+        self, user_id: str
+    ) -> Union[List[Dict[str, Any]], List[Authenticator]]:
         """Retrieves the authenticators for a user
         Args:
             user_id:  A user's id.
@@ -234,11 +377,11 @@ class AuthsignalClient(object):
 
         response = self.session.get(url=path)
 
-        return response.decamelized_content
+        return self._list_response(response, Authenticator)
 
     def enroll_verified_authenticator(
         self, user_id: str, attributes: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    ) -> Union[Dict[str, Any], EnrollVerifiedAuthenticatorResponse]:
         """Enrolls an authenticator for a given user.
         Args:
             user_id:  A user's id. This id should be the same as the user_id used in event calls.
@@ -253,7 +396,7 @@ class AuthsignalClient(object):
             url=path, data=json.dumps(attributes, cls=DecimalEncoder)
         )
 
-        return response.decamelized_content
+        return self._response(response, EnrollVerifiedAuthenticatorResponse)
 
     def delete_authenticator(self, user_id: str, user_authenticator_id: str):
         """Deletes an authenticator from authsignal
@@ -270,7 +413,9 @@ class AuthsignalClient(object):
 
         return
 
-    def validate_challenge(self, attributes: Dict[str, Any]) -> Dict[str, Any]:
+    def validate_challenge(
+        self, attributes: Dict[str, Any]
+    ) -> Union[Dict[str, Any], ValidateChallengeResponse]:
         """Validates a token from authsignal
         Args:
             attributes: A dictionary containing the token to validate.
@@ -283,11 +428,11 @@ class AuthsignalClient(object):
             url=path, data=json.dumps(attributes, cls=DecimalEncoder)
         )
 
-        return response.decamelized_content
+        return self._response(response, ValidateChallengeResponse)
 
     def get_action(
         self, user_id: str, action: str, idempotency_key: str
-    ) -> Dict[str, Any]:
+    ) -> Union[Dict[str, Any], ActionDetails]:
         """Retrieves the action from authsignal for a given user and action.
         Args:
             user_id: A user's id.
@@ -302,7 +447,7 @@ class AuthsignalClient(object):
 
         response = self.session.get(url=path)
 
-        return response.decamelized_content
+        return self._response(response, ActionDetails)
 
     def update_action(
         self,
@@ -310,7 +455,7 @@ class AuthsignalClient(object):
         action: str,
         idempotency_key: str,
         attributes: Dict[str, Any],
-    ) -> Dict[str, Any]:
+    ) -> Union[Dict[str, Any], ActionDetails]:
         """Updates an action in authsignal
         Args:
             user_id: A user's id.
@@ -329,19 +474,167 @@ class AuthsignalClient(object):
             url=path, data=json.dumps(attributes, cls=DecimalEncoder)
         )
 
+        return self._response(response, ActionDetails)
+
+    def bulk_update_users(
+        self,
+        operations: Iterable[Tuple[str, Dict[str, Any]]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        rate: Optional[float] = None,
+        checkpoint_path: Optional[str] = None,
+    ) -> Iterator[BulkResult]:
+        """Updates many users concurrently, yielding a BulkResult per user as it finishes.
+        Args:
+            operations: An iterable of (user_id, attributes) pairs.
+            max_workers: Number of updates in flight at once. Defaults to 8.
+            rate: Optional cap on updates per second.
+            checkpoint_path: Optional file to resume an interrupted job from.
+        """
+        return run_bulk(
+            lambda operation: self.update_user(*operation),
+            operations,
+            max_workers=max_workers,
+            rate=rate,
+            checkpoint_path=checkpoint_path,
+        )
+
+    def bulk_delete_users(
+        self,
+        user_ids: Iterable[str],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        rate: Optional[float] = None,
+        checkpoint_path: Optional[str] = None,
+    ) -> Iterator[BulkResult]:
+        """Deletes many users concurrently, yielding a BulkResult per user as it finishes.
+        Args:
+            user_ids: An iterable of user ids.
+            max_workers: Number of deletes in flight at once. Defaults to 8.
+            rate: Optional cap on deletes per second.
+            checkpoint_path: Optional file to resume an interrupted job from.
+        """
+        return run_bulk(
+            self.delete_user,
+            user_ids,
+            max_workers=max_workers,
+            rate=rate,
+            checkpoint_path=checkpoint_path,
+        )
+
+    def bulk_enroll_verified_authenticators(
+        self,
+        operations: Iterable[Tuple[str, Dict[str, Any]]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        rate: Optional[float] = None,
+        checkpoint_path: Optional[str] = None,
+    ) -> Iterator[BulkResult]:
+        """Enrolls many authenticators concurrently, yielding a BulkResult per enrollment.
+        Args:
+            operations: An iterable of (user_id, attributes) pairs.
+            max_workers: Number of enrollments in flight at once. Defaults to 8.
+            rate: Optional cap on enrollments per second.
+            checkpoint_path: Optional file to resume an interrupted job from.
+                Enrollment isn't idempotent, and an enrollment that completed
+                just before a crash is sent again on resume, so check for
+                duplicate authenticators after resuming.
+        """
+        return run_bulk(
+            lambda operation: self.enroll_verified_authenticator(*operation),
+            operations,
+            max_workers=max_workers,
+            rate=rate,
+            checkpoint_path=checkpoint_path,
+        )
+
+    def _response(self, response, model):
+        if self.typed_responses:
+            return model.from_json(response.json_content)
+        return response.decamelized_content
+
+    def _list_response(self, response, model):
+        if self.typed_responses:
+            return [model.from_json(item) for item in response.json_content]
         return response.decamelized_content
 
 
 class ApiException(Exception):
-    def __init__(self, error_code, error_description, status_code):
+    """An error response from the Authsignal API, or a failure to reach it.
+
+    category classifies the error so callers can decide how to handle it
+    without inspecting status codes: "network" (no response), "rate_limited",
+    "auth", "validation", "not_found", "server", "client", or
+    "invalid_response" (a success status whose body couldn't be decoded).
+    """
+
+    def __init__(self, error_code, error_description, status_code, retry_after=None):
         super().__init__(f"AuthsignalException: {status_code} - {error_description}")
         self.error_code = error_code
         self.error_description = error_description
         self.status_code = status_code
+        self.retry_after = retry_after
 
     def __str__(self):
         return f"AuthsignalException: {self.status_code} - {self.error_description}"
 
+    @property
+    def category(self) -> str:
+        status_code = self.status_code
+        if status_code is None:
+            return "network"
+        if status_code < 400:
+            return "invalid_response"
+        if status_code == 429:
+            return "rate_limited"
+        if status_code in (401, 403):
+            return "auth"
+        if status_code in (400, 409, 422):
+            return "validation"
+        if status_code == 404:
+            return "not_found"
+        if status_code >= 500:
+            return "server"
+        return "client"
+
+    @property
+    def is_retryable(self) -> bool:
+        """Whether sending the same request again may succeed."""
+        if self.status_code in (408, 425):
+            # Request Timeout and Too Early ask for the request to be resent.
+            return True
+        if self.status_code in (501, 505):
+            return False
+        return self.category in ("network", "rate_limited", "server")
+
+    @property
+    def is_rate_limited(self) -> bool:
+        return self.status_code == 429
+
+    @property
+    def is_auth_error(self) -> bool:
+        return self.category == "auth"
+
+    @property
+    def is_validation_error(self) -> bool:
+        return self.category == "validation"
+
+
+def _api_exception_from_response(response: requests.Response) -> ApiException:
+    error_code = None
+    error_description = None
+    if response.content:
+        try:
+            error_data = json.loads(response.content)
+        except ValueError:
+            error_data = None
+        if isinstance(error_data, dict):
+            error_code = error_data.get("errorCode")
+            error_description = error_data.get("errorDescription")
+
+    retry_after = None
+    if response.status_code == 429 or response.status_code == 503:
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+    return ApiException(error_code, error_description, response.status_code, retry_after)
+
 
 def _assert_non_empty_string(val: str, name: str) -> None:
     if not isinstance(val, str) or not val:
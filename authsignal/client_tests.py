@@ -1,9 +1,43 @@
+import json
+import multiprocessing
 import os
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
+
+import requests
+import responses
+
 from .client import AuthsignalClient, ApiException
 
 
+class _UserHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps(
+            {"userId": self.path.rsplit("/", 1)[-1], "pid": self.headers.get("X-Pid")}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _get_user_in_child(client, parent_session, queue):
+    try:
+        client.session.headers["X-Pid"] = str(os.getpid())
+        response = client.get_user(user_id=f"child-{os.getpid()}")
+        queue.put((client.session is not parent_session, response))
+    except Exception as e:  # surfaced by the parent's assertions
+        queue.put((None, repr(e)))
+
+
 class TestQueryUsersUnit(unittest.TestCase):
     """Unit tests for query_users that don't require API credentials."""
 
@@ -161,6 +195,131 @@ class TestQueryUsersUnit(unittest.TestCase):
         self.assertEqual(len(result["users"]), 0)
 
 
+class TestErrorHandling(unittest.TestCase):
+    api_url = "https://api.test.authsignal.com/v1"
+
+    def setUp(self):
+        self.client = AuthsignalClient(api_secret_key="test-secret", api_url=self.api_url)
+
+    def _error_for(self, **kwargs):
+        responses.add(responses.GET, f"{self.api_url}/users/user-1", **kwargs)
+        with self.assertRaises(ApiException) as cm:
+            self.client.get_user(user_id="user-1")
+        return cm.exception
+
+    @responses.activate
+    def test_error_body_is_decoded(self):
+        error = self._error_for(
+            status=400,
+            json={"errorCode": "invalid_request", "errorDescription": "email is invalid"},
+        )
+        self.assertEqual(error.status_code, 400)
+        self.assertEqual(error.error_code, "invalid_request")
+        self.assertEqual(error.error_description, "email is invalid")
+        self.assertEqual(error.category, "validation")
+        self.assertTrue(error.is_validation_error)
+        self.assertFalse(error.is_retryable)
+        self.assertIsNone(error.__cause__)
+
+    @responses.activate
+    def test_error_without_json_body(self):
+        error = self._error_for(status=502, body="Bad Gateway", content_type="text/plain")
+        self.assertEqual(error.status_code, 502)
+        self.assertIsNone(error.error_code)
+        self.assertEqual(error.category, "server")
+        self.assertTrue(error.is_retryable)
+
+    @responses.activate
+    def test_rate_limited(self):
+        error = self._error_for(status=429, headers={"Retry-After": "3"}, json={})
+        self.assertTrue(error.is_rate_limited)
+        self.assertTrue(error.is_retryable)
+        self.assertEqual(error.retry_after, 3.0)
+
+    @responses.activate
+    def test_auth_error(self):
+        error = self._error_for(status=401, json={"errorCode": "unauthorized"})
+        self.assertTrue(error.is_auth_error)
+        self.assertFalse(error.is_retryable)
+
+    @responses.activate
+    def test_network_error(self):
+        error = self._error_for(body=requests.exceptions.ConnectionError("refused"))
+        self.assertIsNone(error.status_code)
+        self.assertEqual(error.category, "network")
+        self.assertTrue(error.is_retryable)
+        self.assertIsInstance(error.__cause__, requests.exceptions.ConnectionError)
+
+    @responses.activate
+    def test_invalid_json_success_body(self):
+        error = self._error_for(status=200, body="{", content_type="application/json")
+        self.assertEqual(error.status_code, 200)
+        self.assertEqual(error.category, "invalid_response")
+        self.assertFalse(error.is_retryable)
+        self.assertIsNone(error.__cause__)
+        self.assertIsNone(error.__context__)
+
+    def test_categories(self):
+        cases = {
+            None: "network",
+            403: "auth",
+            404: "not_found",
+            409: "validation",
+            418: "client",
+            501: "server",
+        }
+        for status_code, category in cases.items():
+            self.assertEqual(ApiException(None, None, status_code).category, category)
+        self.assertFalse(ApiException(None, None, 501).is_retryable)
+        self.assertFalse(ApiException(None, None, 418).is_retryable)
+        for status_code in (408, 425):
+            self.assertTrue(ApiException(None, None, status_code).is_retryable)
+
+
+@unittest.skipUnless(
+    "fork" in multiprocessing.get_all_start_methods(), "requires the fork start method"
+)
+class TestForkSafety(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _UserHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = AuthsignalClient(
+            api_secret_key="test-secret",
+            api_url=f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_forked_children_rebuild_session(self):
+        # Open a pooled keep-alive connection in the parent before forking.
+        self.assertEqual(self.client.get_user(user_id="parent")["user_id"], "parent")
+        parent_session = self.client.session
+
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        children = [
+            context.Process(
+                target=_get_user_in_child, args=(self.client, parent_session, queue)
+            )
+            for _ in range(4)
+        ]
+        for child in children:
+            child.start()
+        results = [queue.get(timeout=10) for _ in children]
+        for child in children:
+            child.join(timeout=10)
+            self.assertEqual(child.exitcode, 0)
+
+        for rebuilt, response in results:
+            self.assertIs(rebuilt, True, response)
+            self.assertEqual(response["user_id"], f"child-{response['pid']}")
+
+        self.assertIs(self.client.session, parent_session)
+        self.assertEqual(self.client.get_user(user_id="parent")["user_id"], "parent")
+
+
 class TestAuthsignalClient(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
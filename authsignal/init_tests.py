@@ -0,0 +1,53 @@
+import subprocess
+import sys
+import unittest
+
+import authsignal
+
+HEAVY_MODULES = ("requests", "humps", "jwt", "decimal", "asyncio", "authsignal.client")
+
+
+def _loaded_after(statement):
+    code = (
+        f"import sys; {statement}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_package_loads_nothing_heavy(self):
+        self.assertEqual(_loaded_after("import authsignal"), [])
+
+    def test_webhook_import_loads_nothing_heavy(self):
+        self.assertEqual(_loaded_after("from authsignal import Webhook"), [])
+
+    def test_client_import_loads_its_dependencies(self):
+        loaded = _loaded_after("from authsignal import AuthsignalClient")
+        self.assertIn("requests", loaded)
+        self.assertIn("authsignal.client", loaded)
+
+    def test_public_names_resolve(self):
+        for name in authsignal.__all__:
+            self.assertIs(getattr(authsignal, name), getattr(authsignal, name))
+        self.assertEqual(authsignal.Webhook.__module__, "authsignal.webhook")
+        self.assertIn("AuthsignalClient", dir(authsignal))
+
+    def test_submodules_resolve_after_plain_import(self):
+        loaded = _loaded_after("import authsignal; authsignal.client.ApiException")
+        self.assertIn("authsignal.client", loaded)
+        self.assertIs(authsignal.webhook.Webhook, authsignal.Webhook)
+        self.assertEqual(
+            _loaded_after("import authsignal; authsignal.version.VERSION"), []
+        )
+
+    def test_unknown_name_raises_attribute_error(self):
+        with self.assertRaises(AttributeError):
+            authsignal.NotAThing
+
+
+if __name__ == "__main__":
+    unittest.main()
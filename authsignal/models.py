@@ -0,0 +1,298 @@
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import humps
+
+
+class ActionState(str, Enum):
+    BLOCK = "BLOCK"
+    ALLOW = "ALLOW"
+    CHALLENGE_REQUIRED = "CHALLENGE_REQUIRED"
+    CHALLENGE_FAILED = "CHALLENGE_FAILED"
+    CHALLENGE_SUCCEEDED = "CHALLENGE_SUCCEEDED"
+    REVIEW_REQUIRED = "REVIEW_REQUIRED"
+    REVIEW_FAILED = "REVIEW_FAILED"
+    REVIEW_SUCCEEDED = "REVIEW_SUCCEEDED"
+
+
+def _action_state(value: Any) -> Any:
+    try:
+        return ActionState(value)
+    except ValueError:
+        return value
+
+
+class Model:
+    """Base class for typed responses built straight from the decoded JSON.
+
+    Subclasses list their fields as (camelCaseKey, snake_case_attr, converter)
+    tuples and declare matching __slots__. Keys the model doesn't know about are
+    kept, decamelized, in `extra` so nothing the API returns is dropped.
+    Attributes hold free-form values such as `custom` and `output` as the API
+    sent them, and read as None when the field was absent.
+
+    The mapping methods give read-only dict compatibility with the snake_case
+    dict returned by the untyped client: a field the API sent as null is
+    present with the value None, an absent field is missing, and free-form
+    values come back with their nested keys decamelized too.
+    """
+
+    __slots__ = ("extra",)
+    _fields: Tuple[Tuple[str, str, Any], ...] = ()
+
+    def __init__(self, **kwargs):
+        for _, attr, _ in self._fields:
+            if attr in kwargs:
+                setattr(self, attr, kwargs.pop(attr))
+        self.extra = kwargs or None
+
+    @classmethod
+    def from_json(cls, data: Optional[Dict[str, Any]]):
+        if data is None:
+            return None
+        self = cls.__new__(cls)
+        known = cls._key_map()
+        extra = None
+        for key, value in data.items():
+            field = known.get(key)
+            if field is None:
+                if extra is None:
+                    extra = {}
+                extra[humps.decamelize(key)] = value
+                continue
+            attr, convert = field
+            setattr(self, attr, convert(value) if convert and value is not None else value)
+        self.extra = extra
+        return self
+
+    @classmethod
+    def _key_map(cls) -> Dict[str, Tuple[str, Any]]:
+        key_map = cls.__dict__.get("_key_map_cache")
+        if key_map is None:
+            key_map = {key: (attr, convert) for key, attr, convert in cls._fields}
+            cls._key_map_cache = key_map
+        return key_map
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached when a field's slot was never set, i.e. the API didn't
+        # send it.
+        if name in type(self).__slots__:
+            return None
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def _is_set(self, attr: str) -> bool:
+        try:
+            object.__getattribute__(self, attr)
+        except AttributeError:
+            return False
+        return True
+
+    def __getitem__(self, key: str) -> Any:
+        if key in type(self).__slots__ and self._is_set(key):
+            value = getattr(self, key)
+        elif self.extra and key in self.extra:
+            value = self.extra[key]
+        else:
+            raise KeyError(key)
+        if isinstance(value, (dict, list)):
+            return humps.decamelize(value)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        if key in type(self).__slots__:
+            return self._is_set(key)
+        return bool(self.extra) and key in self.extra
+
+    def keys(self) -> Iterator[str]:
+        for _, attr, _ in self._fields:
+            if self._is_set(attr):
+                yield attr
+        if self.extra:
+            yield from self.extra
+
+    __iter__ = keys
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.keys())
+
+    def values(self) -> Iterator[Any]:
+        for key in self.keys():
+            yield self[key]
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for key in self.keys():
+            yield key, self[key]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the snake_case dict the untyped client would have returned."""
+        return {key: _to_plain(value) for key, value in self.items()}
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Model):
+            return type(self) is type(other) and self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+
+def _to_plain(value: Any) -> Any:
+    if isinstance(value, Model):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_plain(item) for item in value]
+    if isinstance(value, ActionState):
+        return value.value
+    return value
+
+
+def _list_of(model):
+    def convert(values: List[Dict[str, Any]]) -> List[Any]:
+        return [model.from_json(value) for value in values]
+
+    return convert
+
+
+class TrackResponse(Model):
+    __slots__ = (
+        "state",
+        "idempotency_key",
+        "url",
+        "token",
+        "is_enrolled",
+        "enrolled_verification_methods",
+        "allowed_verification_methods",
+        "default_verification_method",
+    )
+    _fields = (
+        ("state", "state", _action_state),
+        ("idempotencyKey", "idempotency_key", None),
+        ("url", "url", None),
+        ("token", "token", None),
+        ("isEnrolled", "is_enrolled", None),
+        ("enrolledVerificationMethods", "enrolled_verification_methods", None),
+        ("allowedVerificationMethods", "allowed_verification_methods", None),
+        ("defaultVerificationMethod", "default_verification_method", None),
+    )
+
+
+class User(Model):
+    __slots__ = (
+        "user_id",
+        "email",
+        "email_verified",
+        "phone_number",
+        "phone_number_verified",
+        "username",
+        "display_name",
+        "custom",
+        "is_enrolled",
+        "enrolled_verification_methods",
+        "allowed_verification_methods",
+        "default_verification_method",
+    )
+    _fields = (
+        ("userId", "user_id", None),
+        ("email", "email", None),
+        ("emailVerified", "email_verified", None),
+        ("phoneNumber", "phone_number", None),
+        ("phoneNumberVerified", "phone_number_verified", None),
+        ("username", "username", None),
+        ("displayName", "display_name", None),
+        ("custom", "custom", None),
+        ("isEnrolled", "is_enrolled", None),
+        ("enrolledVerificationMethods", "enrolled_verification_methods", None),
+        ("allowedVerificationMethods", "allowed_verification_methods", None),
+        ("defaultVerificationMethod", "default_verification_method", None),
+    )
+
+
+class QueryUsersResponse(Model):
+    __slots__ = ("users", "last_evaluated_user_id", "token_payload")
+    _fields = (
+        ("users", "users", _list_of(User)),
+        ("lastEvaluatedUserId", "last_evaluated_user_id", None),
+        ("tokenPayload", "token_payload", None),
+    )
+
+
+class Authenticator(Model):
+    __slots__ = (
+        "user_authenticator_id",
+        "user_id",
+        "verification_method",
+        "created_at",
+        "verified_at",
+        "last_verified_at",
+        "email",
+        "phone_number",
+        "username",
+        "display_name",
+        "is_default",
+    )
+    _fields = (
+        ("userAuthenticatorId", "user_authenticator_id", None),
+        ("userId", "user_id", None),
+        ("verificationMethod", "verification_method", None),
+        ("createdAt", "created_at", None),
+        ("verifiedAt", "verified_at", None),
+        ("lastVerifiedAt", "last_verified_at", None),
+        ("email", "email", None),
+        ("phoneNumber", "phone_number", None),
+        ("username", "username", None),
+        ("displayName", "display_name", None),
+        ("isDefault", "is_default", None),
+    )
+
+
+class EnrollVerifiedAuthenticatorResponse(Model):
+    __slots__ = ("authenticator", "recovery_codes")
+    _fields = (
+        ("authenticator", "authenticator", Authenticator.from_json),
+        ("recoveryCodes", "recovery_codes", None),
+    )
+
+
+class ActionDetails(Model):
+    __slots__ = (
+        "state",
+        "created_at",
+        "state_updated_at",
+        "verification_method",
+        "rule_ids",
+        "output",
+    )
+    _fields = (
+        ("state", "state", _action_state),
+        ("createdAt", "created_at", None),
+        ("stateUpdatedAt", "state_updated_at", None),
+        ("verificationMethod", "verification_method", None),
+        ("ruleIds", "rule_ids", None),
+        ("output", "output", None),
+    )
+
+
+class ValidateChallengeResponse(Model):
+    __slots__ = (
+        "is_valid",
+        "state",
+        "user_id",
+        "action",
+        "idempotency_key",
+        "verification_method",
+    )
+    _fields = (
+        ("isValid", "is_valid", None),
+        ("state", "state", _action_state),
+        ("userId", "user_id", None),
+        ("action", "action", None),
+        ("idempotencyKey", "idempotency_key", None),
+        ("verificationMethod", "verification_method", None),
+    )
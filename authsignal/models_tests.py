@@ -0,0 +1,170 @@
+import unittest
+
+import humps
+import responses
+
+from .client import AuthsignalClient
+from .models import (
+    ActionDetails,
+    ActionState,
+    Authenticator,
+    EnrollVerifiedAuthenticatorResponse,
+    QueryUsersResponse,
+    TrackResponse,
+    User,
+)
+
+API_URL = "https://api.test.authsignal.com/v1"
+
+TRACK_JSON = {
+    "state": "CHALLENGE_REQUIRED",
+    "idempotencyKey": "key-1",
+    "url": "https://challenge.authsignal.com/abc",
+    "token": "token-1",
+    "isEnrolled": True,
+    "allowedVerificationMethods": ["EMAIL_OTP"],
+    "ruleIds": ["rule-1"],
+}
+
+
+class TestModels(unittest.TestCase):
+    def test_track_response_from_json(self):
+        track = TrackResponse.from_json(TRACK_JSON)
+
+        self.assertIs(track.state, ActionState.CHALLENGE_REQUIRED)
+        self.assertEqual(track.idempotency_key, "key-1")
+        self.assertTrue(track.is_enrolled)
+        self.assertIsNone(track.default_verification_method)
+        self.assertEqual(track.extra, {"rule_ids": ["rule-1"]})
+
+    def test_dict_compat(self):
+        track = TrackResponse.from_json(TRACK_JSON)
+
+        self.assertEqual(track["state"], "CHALLENGE_REQUIRED")
+        self.assertEqual(track.get("idempotency_key"), "key-1")
+        self.assertEqual(track.get("rule_ids"), ["rule-1"])
+        self.assertEqual(track.get("default_verification_method", "NONE"), "NONE")
+        self.assertIn("url", track)
+        self.assertNotIn("default_verification_method", track)
+        with self.assertRaises(KeyError):
+            track["default_verification_method"]
+
+    def test_to_dict_matches_decamelized(self):
+        track = TrackResponse.from_json(TRACK_JSON)
+
+        self.assertEqual(
+            track.to_dict(),
+            {
+                "state": "CHALLENGE_REQUIRED",
+                "idempotency_key": "key-1",
+                "url": "https://challenge.authsignal.com/abc",
+                "token": "token-1",
+                "is_enrolled": True,
+                "allowed_verification_methods": ["EMAIL_OTP"],
+                "rule_ids": ["rule-1"],
+            },
+        )
+
+    def test_nulls_and_nested_keys_match_decamelized(self):
+        data = {
+            "users": [
+                {
+                    "userId": "user-1",
+                    "email": None,
+                    "custom": {"favColor": "red", "pastOrders": [{"orderId": 1}]},
+                }
+            ],
+            "lastEvaluatedUserId": None,
+            "newField": {"nestedKey": True},
+        }
+        expected = humps.decamelize(data)
+
+        query = QueryUsersResponse.from_json(data)
+        user = query.users[0]
+
+        self.assertEqual(query.to_dict(), expected)
+        self.assertEqual(dict(query.items()), {**expected, "users": query.users})
+        self.assertIn("email", user)
+        self.assertIsNone(user["email"])
+        self.assertNotIn("phone_number", user)
+        self.assertIsNone(user.phone_number)
+        self.assertEqual(user["custom"], {"fav_color": "red", "past_orders": [{"order_id": 1}]})
+        self.assertEqual(user.custom, data["users"][0]["custom"])
+        self.assertEqual(query["new_field"], {"nested_key": True})
+
+    def test_iteration(self):
+        user = User.from_json({"userId": "user-1", "email": None, "someNewField": 1})
+
+        self.assertEqual(list(user), ["user_id", "email", "some_new_field"])
+        self.assertEqual(len(user), 3)
+        self.assertEqual(list(user.values()), ["user-1", None, 1])
+        self.assertEqual(dict(user), {"user_id": "user-1", "email": None, "some_new_field": 1})
+
+    def test_slots(self):
+        user = User.from_json({"userId": "user-1"})
+
+        self.assertFalse(hasattr(user, "__dict__"))
+        with self.assertRaises(AttributeError):
+            user.not_a_field = 1
+
+    def test_unknown_state_is_kept(self):
+        action = ActionDetails.from_json({"state": "SOMETHING_NEW"})
+        self.assertEqual(action.state, "SOMETHING_NEW")
+
+    def test_nested_models(self):
+        query = QueryUsersResponse.from_json(
+            {"users": [{"userId": "user-1", "emailVerified": True}]}
+        )
+        self.assertIsInstance(query.users[0], User)
+        self.assertTrue(query.users[0].email_verified)
+
+        enroll = EnrollVerifiedAuthenticatorResponse.from_json(
+            {"authenticator": {"userAuthenticatorId": "auth-1"}, "recoveryCodes": ["a"]}
+        )
+        self.assertIsInstance(enroll.authenticator, Authenticator)
+        self.assertEqual(enroll["authenticator"]["user_authenticator_id"], "auth-1")
+        self.assertEqual(
+            enroll.to_dict(),
+            {"authenticator": {"user_authenticator_id": "auth-1"}, "recovery_codes": ["a"]},
+        )
+
+
+class TestTypedClient(unittest.TestCase):
+    def setUp(self):
+        self.client = AuthsignalClient("secret", API_URL, typed_responses=True)
+
+    @responses.activate
+    def test_track_returns_model(self):
+        responses.add(
+            responses.POST, f"{API_URL}/users/user-1/actions/signIn", json=TRACK_JSON
+        )
+
+        track = self.client.track("user-1", "signIn")
+
+        self.assertIsInstance(track, TrackResponse)
+        self.assertIs(track.state, ActionState.CHALLENGE_REQUIRED)
+
+    @responses.activate
+    def test_get_authenticators_returns_models(self):
+        responses.add(
+            responses.GET,
+            f"{API_URL}/users/user-1/authenticators",
+            json=[{"userAuthenticatorId": "auth-1", "verificationMethod": "EMAIL_OTP"}],
+        )
+
+        authenticators = self.client.get_authenticators("user-1")
+
+        self.assertIsInstance(authenticators[0], Authenticator)
+        self.assertEqual(authenticators[0].verification_method, "EMAIL_OTP")
+
+    @responses.activate
+    def test_untyped_client_still_returns_dicts(self):
+        responses.add(responses.GET, f"{API_URL}/users/user-1", json={"userId": "user-1"})
+
+        client = AuthsignalClient("secret", API_URL)
+
+        self.assertEqual(client.get_user("user-1"), {"user_id": "user-1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+import email.utils
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_RATE = 50.0  # requests per second
+DEFAULT_BURST = 50
+DEFAULT_MAX_RETRIES = 3
+
+# X-RateLimit-Reset values above this are epoch timestamps, not a delta.
+EPOCH_THRESHOLD = 1_000_000_000
+
+ENDPOINT_CLASSES = ("validate", "actions", "authenticators", "users", "default")
+
+_buckets = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    # A lock held by another thread at fork time would never be released in
+    # the child, so every bucket gets a fresh one.
+    for bucket in list(_buckets):
+        bucket._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def classify_endpoint(method: str, url: str) -> str:
+    """Maps a request onto one of ENDPOINT_CLASSES."""
+    path = urlsplit(url).path
+    if path.endswith("/validate"):
+        return "validate"
+    if "/actions" in path:
+        return "actions"
+    if "/authenticators" in path:
+        return "authenticators"
+    if "/users" in path:
+        return "users"
+    return "default"
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+class TokenBucket:
+    """A thread-safe token bucket that hands out send slots in FIFO order.
+
+    Callers reserve a slot under a short lock and then sleep outside of it, so
+    tokens may go negative: every caller is queued behind the ones that arrived
+    before it rather than racing for the next refill.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        min_rate: float = None,
+        backoff_factor: float = 0.5,
+        recovery_factor: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate) if min_rate is not None else self.max_rate / 20
+        self.burst = burst
+        self.backoff_factor = backoff_factor
+        self.recovery_factor = recovery_factor
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rate = self.max_rate
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._backoff_until = float("-inf")
+        _buckets.add(self)
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def reserve(self) -> float:
+        """Takes a token and returns how many seconds the caller must wait."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            wait = self._updated - now
+            if self._tokens < 0:
+                wait += -self._tokens / self._rate
+            return max(0.0, wait)
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        import asyncio
+
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Holds back every new reservation for at least `seconds`."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            resume_at = now + seconds
+            if resume_at > self._updated:
+                self._updated = resume_at
+                self._tokens = min(self._tokens, 0.0)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """Multiplicatively lowers the rate after a 429 response.
+
+        Requests already in flight when the limit was hit come back as a burst
+        of 429s, so the rate is lowered once per congestion event: further
+        429s are ignored until Retry-After has passed, or for the time the
+        bucket takes to refill at the lowered rate.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if now >= self._backoff_until:
+                self._rate = max(self.min_rate, self._rate * self.backoff_factor)
+                self._backoff_until = now + max(retry_after or 0.0, self.burst / self._rate)
+        if retry_after:
+            self.pause(retry_after)
+
+    def on_success(self) -> None:
+        """Additively creeps the rate back towards max_rate."""
+        if self._rate >= self.max_rate:
+            return
+        with self._lock:
+            self._refill(self._clock())
+            self._rate = min(self.max_rate, self._rate + self.max_rate * self.recovery_factor)
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+
+class RateLimiter:
+    """Per endpoint-class token buckets that adapt to the API's 429 responses.
+
+    Args:
+        rate: Default requests per second for every endpoint class.
+        burst: Default bucket capacity for every endpoint class.
+        limits: Optional overrides keyed by endpoint class, as (rate, burst).
+        max_retries: How many times a throttled request is queued and resent
+            before the 429 is surfaced as an ApiException.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        limits: Dict[str, Tuple[float, int]] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        classify: Callable[[str, str], str] = classify_endpoint,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        limits = limits or {}
+        unknown = set(limits) - set(ENDPOINT_CLASSES)
+        if unknown:
+            raise ValueError(f"Unknown endpoint classes: {', '.join(sorted(unknown))}")
+
+        self.max_retries = max_retries
+        self.classify = classify
+        self.buckets: Dict[str, TokenBucket] = {}
+        for endpoint_class in ENDPOINT_CLASSES:
+            class_rate, class_burst = limits.get(endpoint_class, (rate, burst))
+            self.buckets[endpoint_class] = TokenBucket(
+                rate=class_rate, burst=class_burst, clock=clock
+            )
+
+    def bucket_for(self, method: str, url: str) -> TokenBucket:
+        return self.buckets[self.classify(method, url)]
+
+    def observe(self, bucket: TokenBucket, response) -> None:
+        """Feeds a response's status and rate-limit headers back into a bucket."""
+        headers = response.headers
+        if response.status_code == 429:
+            bucket.on_throttled(parse_retry_after(headers.get("Retry-After")))
+            return
+
+        bucket.on_success()
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None and remaining.strip() == "0":
+            reset = parse_retry_after(headers.get("X-RateLimit-Reset"))
+            if reset and reset > EPOCH_THRESHOLD:
+                reset = max(0.0, reset - time.time())
+            if reset:
+                bucket.pause(reset)
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import unittest
+
+import responses
+
+from .client import AuthsignalClient, ApiException
+from .rate_limiter import RateLimiter, TokenBucket, classify_endpoint, parse_retry_after
+
+API_URL = "https://api.test.authsignal.com/v1"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate=10, burst=2, clock=self.clock)
+
+    def test_burst_then_fifo_waits(self):
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertAlmostEqual(self.bucket.reserve(), 0.1)
+        self.assertAlmostEqual(self.bucket.reserve(), 0.2)
+
+    def test_refill_is_capped_at_burst(self):
+        self.clock.now = 100
+        self.bucket.reserve()
+        self.bucket.reserve()
+        self.assertAlmostEqual(self.bucket.reserve(), 0.1)
+
+    def test_throttle_halves_rate_and_honours_retry_after(self):
+        self.bucket.on_throttled(retry_after=3)
+        self.assertEqual(self.bucket.rate, 5)
+        self.assertAlmostEqual(self.bucket.reserve(), 3.2)
+
+    def test_rate_never_drops_below_min_rate(self):
+        for _ in range(20):
+            self.clock.now += 100
+            self.bucket.on_throttled()
+        self.assertEqual(self.bucket.rate, self.bucket.min_rate)
+
+    def test_burst_of_throttles_backs_off_once(self):
+        for _ in range(8):
+            self.bucket.on_throttled()
+        self.assertEqual(self.bucket.rate, 5)
+
+        # Once the bucket has had time to refill, a new 429 is new congestion.
+        self.clock.now += self.bucket.burst / 5
+        self.bucket.on_throttled()
+        self.assertEqual(self.bucket.rate, 2.5)
+
+    def test_retry_after_extends_the_backoff_window(self):
+        self.bucket.on_throttled(retry_after=10)
+        self.clock.now += 5
+        self.bucket.on_throttled()
+        self.assertEqual(self.bucket.rate, 5)
+
+    def test_success_recovers_rate(self):
+        self.bucket.on_throttled()
+        for _ in range(50):
+            self.bucket.on_success()
+        self.assertEqual(self.bucket.rate, 10)
+
+    def test_concurrent_reservations_are_unique_slots(self):
+        bucket = TokenBucket(rate=100, burst=1, clock=self.clock)
+        waits = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(50):
+                wait = bucket.reserve()
+                with lock:
+                    waits.append(round(wait, 6))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(waits), 400)
+        self.assertEqual(len(set(waits)), 400)
+
+    def test_acquire_async(self):
+        bucket = TokenBucket(rate=1000, burst=1)
+
+        async def run():
+            await asyncio.gather(*(bucket.acquire_async() for _ in range(5)))
+
+        asyncio.run(run())
+
+
+class TestRateLimiterHelpers(unittest.TestCase):
+    def test_classify_endpoint(self):
+        self.assertEqual(classify_endpoint("POST", f"{API_URL}/validate"), "validate")
+        self.assertEqual(classify_endpoint("POST", f"{API_URL}/users/u/actions/signIn"), "actions")
+        self.assertEqual(classify_endpoint("GET", f"{API_URL}/users/u/authenticators"), "authenticators")
+        self.assertEqual(classify_endpoint("GET", f"{API_URL}/users?email=a"), "users")
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("2"), 2.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Thu, 01 Jan 1970 00:00:10 GMT", now=4), 6.0)
+
+    def test_unknown_endpoint_class(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(limits={"nope": (1, 1)})
+
+
+class TestClientRateLimiting(unittest.TestCase):
+    @responses.activate
+    def test_throttled_request_is_resent(self):
+        url = f"{API_URL}/users/user-1"
+        responses.add(responses.GET, url, status=429, headers={"Retry-After": "0"})
+        responses.add(responses.GET, url, json={"userId": "user-1"})
+
+        limiter = RateLimiter(rate=1000, burst=10)
+        client = AuthsignalClient("secret", API_URL, rate_limiter=limiter)
+
+        self.assertEqual(client.get_user("user-1"), {"user_id": "user-1"})
+        self.assertEqual(len(responses.calls), 2)
+        self.assertLess(limiter.buckets["users"].rate, 1000)
+
+    @responses.activate
+    def test_concurrent_throttles_halve_rate_once(self):
+        responses.add(responses.GET, f"{API_URL}/users/user-1", status=429, json={})
+
+        limiter = RateLimiter(rate=1000, burst=1000, max_retries=0)
+        client = AuthsignalClient("secret", API_URL, rate_limiter=limiter)
+        barrier = threading.Barrier(8, timeout=5)
+        errors = []
+
+        def worker():
+            barrier.wait()
+            try:
+                client.get_user("user-1")
+            except ApiException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 8)
+        self.assertEqual(limiter.buckets["users"].rate, 500)
+
+    @responses.activate
+    def test_gives_up_after_max_retries(self):
+        url = f"{API_URL}/users/user-1"
+        responses.add(
+            responses.GET,
+            url,
+            status=429,
+            headers={"Retry-After": "0"},
+            json={"errorCode": "too_many_requests"},
+        )
+
+        limiter = RateLimiter(rate=1000, burst=10, max_retries=2)
+        client = AuthsignalClient("secret", API_URL, rate_limiter=limiter)
+
+        with self.assertRaises(ApiException) as cm:
+            client.get_user("user-1")
+        self.assertEqual(cm.exception.status_code, 429)
+        self.assertEqual(len(responses.calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,492 @@
+"""A local stand-in for the Authsignal API for load testing and offline development.
+
+The simulator keeps users, authenticators and actions in memory and answers
+the endpoints used by AuthsignalClient with the same JSON shapes as the real
+API. Latency, injected errors and signed webhooks are configurable.
+
+Run it from the command line:
+
+    python -m authsignal.simulator --port 8080 --secret my-secret
+
+or embed it in tests:
+
+    with Simulator(api_secret_key="secret").serve_in_thread() as api_url:
+        client = AuthsignalClient("secret", api_url)
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+import urllib.parse
+import uuid
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_VERIFICATION_METHODS = ["EMAIL_OTP", "SMS", "AUTHENTICATOR_APP", "PASSKEY"]
+UNAUTHORIZED_DESCRIPTION = (
+    "The request is unauthorized. "
+    "Check that your API key and region base URL are correctly configured."
+)
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class SimulatorError(Exception):
+    def __init__(self, status: int, error_code: str, error_description: str):
+        super().__init__(error_description)
+        self.status = status
+        self.error_code = error_code
+        self.error_description = error_description
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def sign_webhook(secret: str, payload: str, timestamp: Optional[int] = None) -> str:
+    """Returns an X-Signature-V2 header value for payload, as Authsignal would send it."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).digest()
+    signature = base64.b64encode(digest).decode().replace("=", "")
+    return f"t={timestamp},v2={signature}"
+
+
+class Simulator:
+    """An in-memory Authsignal API served over HTTP/1.1 by asyncio.
+
+    Args:
+        api_secret_key: The secret clients must authenticate with.
+        latency: Seconds added to every response, or a (min, max) range to
+            draw from uniformly. Defaults to 0.
+        error_rate: Fraction of requests, between 0 and 1, answered with an
+            injected error instead of being handled. Defaults to 0.
+        error_statuses: Status codes injected errors are drawn from.
+        retry_after: Retry-After seconds sent with injected 429 responses.
+        track_state: The state every tracked action starts in.
+        webhook_url: When set, action.created and action.updated events are
+            POSTed here, signed with webhook_secret.
+        webhook_secret: Secret used to sign webhooks. Defaults to
+            api_secret_key.
+        tenant_id: Tenant id reported in webhook events.
+        seed: Seed for latency and error injection, for repeatable runs.
+    """
+
+    def __init__(
+        self,
+        api_secret_key: str,
+        latency: Union[float, Tuple[float, float]] = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = (500, 503, 429),
+        retry_after: float = 1,
+        track_state: str = "CHALLENGE_REQUIRED",
+        webhook_url: Optional[str] = None,
+        webhook_secret: Optional[str] = None,
+        tenant_id: str = "00000000-0000-0000-0000-000000000000",
+        seed: Optional[int] = None,
+    ):
+        self.api_secret_key = api_secret_key
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.retry_after = retry_after
+        self.track_state = track_state
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret or api_secret_key
+        self.tenant_id = tenant_id
+
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.authenticators: Dict[str, List[Dict[str, Any]]] = {}
+        self.actions: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.tokens: Dict[str, Tuple[str, str, str]] = {}
+        self.request_count = 0
+
+        self._random = random.Random(seed)
+        self._authorization = "Basic " + base64.b64encode(f"{api_secret_key}:".encode()).decode()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._webhook_tasks: set = set()
+        self._writers: set = set()
+
+    # Serving
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Starts listening and returns the API base URL to give the client."""
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed open.
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._webhook_tasks:
+            await asyncio.gather(*self._webhook_tasks, return_exceptions=True)
+
+    @contextlib.contextmanager
+    def serve_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+        """Runs the simulator on a background event loop for the duration of the block."""
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            yield asyncio.run_coroutine_threadsafe(self.start(host, port), loop).result()
+        finally:
+            asyncio.run_coroutine_threadsafe(self.stop(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_SIZE:
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload, extra_headers = await self._respond(method, target, headers, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(self._encode_response(status, payload, extra_headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    @staticmethod
+    def _encode_response(status: int, payload: Any, extra_headers: Dict[str, str], keep_alive: bool) -> bytes:
+        body = json.dumps(payload).encode()
+        lines = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in extra_headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _respond(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        self.request_count += 1
+        await self._delay()
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            status = self._random.choice(self.error_statuses)
+            extra_headers = {"Retry-After": str(self.retry_after)} if status == 429 else {}
+            return status, self._error_body(status, "Injected by the simulator."), extra_headers
+
+        try:
+            if not hmac.compare_digest(headers.get("authorization", ""), self._authorization):
+                raise SimulatorError(401, "unauthorized", UNAUTHORIZED_DESCRIPTION)
+            url = urllib.parse.urlsplit(target)
+            query = dict(urllib.parse.parse_qsl(url.query))
+            try:
+                data = json.loads(body) if body else {}
+            except ValueError:
+                raise SimulatorError(400, "invalid_request", "The request body is not valid JSON.")
+            if not isinstance(data, dict):
+                raise SimulatorError(400, "invalid_request", "The request body must be a JSON object.")
+            return 200, self.route(method, url.path, query, data), {}
+        except SimulatorError as e:
+            return e.status, {"errorCode": e.error_code, "errorDescription": e.error_description}, {}
+        except Exception as e:
+            # A bug in a handler is answered like the real API would rather
+            # than dropping the connection.
+            return 500, self._error_body(500, f"The simulator failed to handle the request: {e!r}"), {}
+
+    async def _delay(self) -> None:
+        latency = self.latency
+        if isinstance(latency, tuple):
+            latency = self._random.uniform(*latency)
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+    @staticmethod
+    def _error_body(status: int, description: str) -> Dict[str, str]:
+        error_code = HTTPStatus(status).phrase.lower().replace(" ", "_")
+        return {"errorCode": error_code, "errorDescription": description}
+
+    # Routing
+
+    def route(self, method: str, path: str, query: Dict[str, str], data: Dict[str, Any]) -> Any:
+        """Dispatches an API call; raises SimulatorError for error responses."""
+        parts = [urllib.parse.unquote(part) for part in path.strip("/").split("/")]
+        if parts[:1] == ["v1"]:
+            parts = parts[1:]
+
+        if parts == ["validate"] and method == "POST":
+            return self.validate_challenge(data)
+        if parts == ["users"] and method == "GET":
+            return self.query_users(query)
+        if len(parts) >= 2 and parts[0] == "users":
+            user_id, rest = parts[1], parts[2:]
+            if not rest:
+                if method == "GET":
+                    return self.get_user(user_id)
+                if method == "PATCH":
+                    return self.update_user(user_id, data)
+                if method == "DELETE":
+                    return self.delete_user(user_id)
+            elif rest[0] == "authenticators":
+                if len(rest) == 1 and method == "GET":
+                    return self.get_authenticators(user_id)
+                if len(rest) == 1 and method == "POST":
+                    return self.enroll_verified_authenticator(user_id, data)
+                if len(rest) == 2 and method == "DELETE":
+                    return self.delete_authenticator(user_id, rest[1])
+            elif rest[0] == "actions":
+                if len(rest) == 2 and method == "POST":
+                    return self.track(user_id, rest[1], data)
+                if len(rest) == 3 and method == "GET":
+                    return self.get_action(user_id, rest[1], rest[2])
+                if len(rest) == 3 and method == "PATCH":
+                    return self.update_action(user_id, rest[1], rest[2], data)
+
+        raise SimulatorError(404, "not_found", f"No route for {method} {path}.")
+
+    # Users
+
+    def _user(self, user_id: str) -> Dict[str, Any]:
+        user = dict(self.users.get(user_id, {}))
+        methods = [a["verificationMethod"] for a in self.authenticators.get(user_id, [])]
+        user.update(
+            {
+                "userId": user_id,
+                "isEnrolled": bool(methods),
+                "enrolledVerificationMethods": methods,
+                "allowedVerificationMethods": DEFAULT_VERIFICATION_METHODS,
+            }
+        )
+        if methods:
+            user["defaultVerificationMethod"] = methods[0]
+        return user
+
+    def get_user(self, user_id: str) -> Dict[str, Any]:
+        return self._user(user_id)
+
+    def update_user(self, user_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.users[user_id] = {**self.users.get(user_id, {}), **data}
+        return self._user(user_id)
+
+    def delete_user(self, user_id: str) -> Dict[str, Any]:
+        self.users.pop(user_id, None)
+        self.authenticators.pop(user_id, None)
+        return {}
+
+    def query_users(self, query: Dict[str, str]) -> Dict[str, Any]:
+        filters = {k: v for k, v in query.items() if k in ("username", "email", "phoneNumber")}
+        try:
+            limit = int(query.get("limit") or 100)
+        except ValueError:
+            raise SimulatorError(400, "invalid_request", "limit must be an integer.")
+        if limit < 1:
+            raise SimulatorError(400, "invalid_request", "limit must be at least 1.")
+        after = query.get("lastEvaluatedUserId")
+
+        matches = []
+        for user_id in sorted(self.users):
+            if after is not None and user_id <= after:
+                continue
+            if all(self.users[user_id].get(k) == v for k, v in filters.items()):
+                matches.append(self._user(user_id))
+
+        response = {"users": matches[:limit]}
+        if len(matches) > limit:
+            response["lastEvaluatedUserId"] = matches[limit - 1]["userId"]
+        return response
+
+    # Authenticators
+
+    def get_authenticators(self, user_id: str) -> List[Dict[str, Any]]:
+        return list(self.authenticators.get(user_id, []))
+
+    def enroll_verified_authenticator(self, user_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        if not data.get("verificationMethod"):
+            raise SimulatorError(400, "invalid_request", "verificationMethod is required.")
+        now = _now_iso()
+        authenticator = {
+            "userAuthenticatorId": str(uuid.uuid4()),
+            "userId": user_id,
+            "verificationMethod": data["verificationMethod"],
+            "createdAt": now,
+            "verifiedAt": now,
+        }
+        for key in ("email", "phoneNumber", "username"):
+            if key in data:
+                authenticator[key] = data[key]
+        self.authenticators.setdefault(user_id, []).append(authenticator)
+        self.users.setdefault(user_id, {})
+        return {"authenticator": authenticator}
+
+    def delete_authenticator(self, user_id: str, user_authenticator_id: str) -> Dict[str, Any]:
+        authenticators = self.authenticators.get(user_id, [])
+        remaining = [a for a in authenticators if a["userAuthenticatorId"] != user_authenticator_id]
+        if len(remaining) == len(authenticators):
+            raise SimulatorError(404, "not_found", "The authenticator was not found.")
+        self.authenticators[user_id] = remaining
+        return {}
+
+    # Actions
+
+    def track(self, user_id: str, action: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        idempotency_key = str(uuid.uuid4())
+        token = base64.urlsafe_b64encode(uuid.uuid4().bytes).decode().rstrip("=")
+        now = _now_iso()
+        self.actions[(user_id, action, idempotency_key)] = {
+            "state": self.track_state,
+            "createdAt": now,
+            "stateUpdatedAt": now,
+            "ruleIds": [],
+            "output": {"attributes": data},
+        }
+        self.tokens[token] = (user_id, action, idempotency_key)
+
+        user = self._user(user_id)
+        response = {
+            "state": self.track_state,
+            "idempotencyKey": idempotency_key,
+            "url": f"https://simulator.authsignal.local/challenge?token={token}",
+            "token": token,
+            "isEnrolled": user["isEnrolled"],
+            "enrolledVerificationMethods": user["enrolledVerificationMethods"],
+            "allowedVerificationMethods": user["allowedVerificationMethods"],
+        }
+        if "defaultVerificationMethod" in user:
+            response["defaultVerificationMethod"] = user["defaultVerificationMethod"]
+
+        self._emit_action("action.created", user_id, action, idempotency_key, self.track_state)
+        return response
+
+    def _action(self, user_id: str, action: str, idempotency_key: str) -> Dict[str, Any]:
+        details = self.actions.get((user_id, action, idempotency_key))
+        if details is None:
+            raise SimulatorError(404, "not_found", "The action was not found.")
+        return details
+
+    def get_action(self, user_id: str, action: str, idempotency_key: str) -> Dict[str, Any]:
+        return dict(self._action(user_id, action, idempotency_key))
+
+    def update_action(self, user_id: str, action: str, idempotency_key: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        details = self._action(user_id, action, idempotency_key)
+        if "state" in data:
+            details["state"] = data["state"]
+            details["stateUpdatedAt"] = _now_iso()
+        self._emit_action("action.updated", user_id, action, idempotency_key, details["state"])
+        return dict(details)
+
+    def validate_challenge(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        token = data.get("token")
+        if token is not None and not isinstance(token, str):
+            raise SimulatorError(400, "invalid_request", "token must be a string.")
+        key = self.tokens.get(token or "")
+        if key is None:
+            return {"isValid": False}
+        user_id, action, idempotency_key = key
+        state = self.actions[key]["state"]
+        return {
+            "isValid": state == "CHALLENGE_SUCCEEDED",
+            "state": state,
+            "userId": user_id,
+            "action": action,
+            "idempotencyKey": idempotency_key,
+        }
+
+    # Webhooks
+
+    def _emit_action(self, event_type: str, user_id: str, action: str, idempotency_key: str, state: str) -> None:
+        data = {"userId": user_id, "actionCode": action, "idempotencyKey": idempotency_key, "state": state}
+        self._emit(event_type, data)
+
+    def _emit(self, event_type: str, data: Dict[str, Any]) -> None:
+        if not self.webhook_url:
+            return
+        event = {
+            "version": 1,
+            "id": str(uuid.uuid4()),
+            "source": "https://authsignal.com",
+            "time": _now_iso(),
+            "tenantId": self.tenant_id,
+            "type": event_type,
+            "data": data,
+        }
+        task = asyncio.get_running_loop().create_task(self._post_webhook(json.dumps(event)))
+        self._webhook_tasks.add(task)
+        task.add_done_callback(self._webhook_tasks.discard)
+
+    async def _post_webhook(self, payload: str) -> None:
+        url = urllib.parse.urlsplit(self.webhook_url)
+        port = url.port or (443 if url.scheme == "https" else 80)
+        body = payload.encode()
+        request = (
+            f"POST {url.path or '/'}{'?' + url.query if url.query else ''} HTTP/1.1\r\n"
+            f"Host: {url.netloc}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"X-Signature-V2: {sign_webhook(self.webhook_secret, payload)}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode("latin-1") + body
+        try:
+            reader, writer = await asyncio.open_connection(url.hostname, port, ssl=url.scheme == "https" or None)
+            writer.write(request)
+            await writer.drain()
+            await reader.read()
+            writer.close()
+        except OSError:
+            pass
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local Authsignal API simulator.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--secret", default="simulator-secret", help="API secret key clients must use")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument("--webhook-url", help="URL to POST signed webhook events to")
+    args = parser.parse_args(argv)
+
+    simulator = Simulator(
+        api_secret_key=args.secret,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        webhook_url=args.webhook_url,
+    )
+
+    async def serve():
+        api_url = await simulator.start(args.host, args.port)
+        print(f"Authsignal simulator listening on {api_url}", flush=True)
+        await asyncio.Event().wait()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import queue
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from .client import AuthsignalClient, ApiException
+from .simulator import Simulator, UNAUTHORIZED_DESCRIPTION
+from .webhook import Webhook
+
+SECRET = "simulator-secret"
+
+
+class TestSimulator(unittest.TestCase):
+    def setUp(self):
+        self.simulator = Simulator(api_secret_key=SECRET)
+        serving = self.simulator.serve_in_thread()
+        self.api_url = serving.__enter__()
+        self.addCleanup(serving.__exit__, None, None, None)
+        self.client = AuthsignalClient(SECRET, self.api_url)
+
+    def test_actions(self):
+        track_response = self.client.track(
+            user_id="user123", action="signIn", attributes={"email": "a@example.com"}
+        )
+        self.assertEqual(track_response["state"], "CHALLENGE_REQUIRED")
+        self.assertTrue(track_response["idempotency_key"])
+        self.assertTrue(track_response["url"])
+        self.assertTrue(track_response["token"])
+        self.assertFalse(track_response["is_enrolled"])
+
+        get_action_response = self.client.get_action(
+            "user123", "signIn", track_response["idempotency_key"]
+        )
+        self.assertEqual(get_action_response["state"], "CHALLENGE_REQUIRED")
+        self.assertIsNotNone(get_action_response.get("output"))
+
+        update_action_response = self.client.update_action(
+            "user123", "signIn", track_response["idempotency_key"], {"state": "CHALLENGE_SUCCEEDED"}
+        )
+        self.assertEqual(update_action_response["state"], "CHALLENGE_SUCCEEDED")
+
+        validate_response = self.client.validate_challenge({"token": track_response["token"]})
+        self.assertTrue(validate_response["is_valid"])
+        self.assertEqual(validate_response["user_id"], "user123")
+        self.assertEqual(validate_response["action"], "signIn")
+
+    def test_users_and_authenticators(self):
+        user = self.client.update_user("user-1", {"email": "one@example.com", "displayName": "One"})
+        self.assertEqual(user["display_name"], "One")
+
+        enroll_response = self.client.enroll_verified_authenticator(
+            "user-1", {"verificationMethod": "EMAIL_OTP", "email": "one@example.com"}
+        )
+        authenticator = enroll_response["authenticator"]
+        self.assertEqual(authenticator["verification_method"], "EMAIL_OTP")
+        self.assertTrue(self.client.get_user("user-1")["is_enrolled"])
+
+        query_response = self.client.query_users(email="one@example.com")
+        self.assertEqual([u["user_id"] for u in query_response["users"]], ["user-1"])
+
+        self.client.delete_authenticator("user-1", authenticator["user_authenticator_id"])
+        self.assertEqual(self.client.get_authenticators("user-1"), [])
+
+        self.client.delete_user("user-1")
+        self.assertFalse(self.client.get_user("user-1")["is_enrolled"])
+
+    def test_query_users_pagination(self):
+        for i in range(5):
+            self.client.update_user(f"user-{i}", {"username": "same"})
+
+        first_page = self.client.query_users(username="same", limit=3)
+        self.assertEqual(len(first_page["users"]), 3)
+        second_page = self.client.query_users(
+            username="same", limit=3, last_evaluated_user_id=first_page["last_evaluated_user_id"]
+        )
+        self.assertEqual(len(second_page["users"]), 2)
+        self.assertNotIn("last_evaluated_user_id", second_page)
+
+    def test_bad_secret(self):
+        client = AuthsignalClient("bad-secret", self.api_url)
+
+        with self.assertRaises(ApiException) as cm:
+            client.get_user("user-1")
+        self.assertEqual(cm.exception.status_code, 401)
+        self.assertEqual(cm.exception.error_code, "unauthorized")
+        self.assertEqual(cm.exception.error_description, UNAUTHORIZED_DESCRIPTION)
+
+    def test_unknown_action(self):
+        with self.assertRaises(ApiException) as cm:
+            self.client.get_action("user-1", "signIn", "missing")
+        self.assertEqual(cm.exception.status_code, 404)
+
+    def test_malformed_requests_are_rejected(self):
+        cases = [
+            ("PATCH", "/users/user-1", "[1]"),
+            ("POST", "/validate", "[]"),
+            ("POST", "/validate", '{"token": ["x"]}'),
+            ("POST", "/users/user-1/authenticators", '"s"'),
+            ("GET", "/users?limit=abc", None),
+            ("GET", "/users?limit=0", None),
+        ]
+        for method, path, body in cases:
+            response = requests.request(
+                method, f"{self.api_url}{path}", data=body, auth=(SECRET, ""), timeout=5
+            )
+            self.assertEqual(response.status_code, 400, (method, path, body))
+            self.assertEqual(response.json()["errorCode"], "invalid_request")
+        self.assertEqual(self.simulator.users, {})
+
+    def test_error_injection_and_latency(self):
+        self.simulator.error_rate = 1
+        self.simulator.error_statuses = (503,)
+        with self.assertRaises(ApiException) as cm:
+            self.client.get_user("user-1")
+        self.assertEqual(cm.exception.status_code, 503)
+
+        self.simulator.error_rate = 0
+        self.simulator.latency = 0.05
+        start = time.monotonic()
+        self.client.get_user("user-1")
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+
+class _WebhookReceiver(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        self.server.received.put((payload, self.headers["X-Signature-V2"]))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSimulatorWebhooks(unittest.TestCase):
+    def test_emits_signed_webhooks(self):
+        receiver = ThreadingHTTPServer(("127.0.0.1", 0), _WebhookReceiver)
+        receiver.received = queue.Queue()
+        threading.Thread(target=receiver.serve_forever, daemon=True).start()
+        self.addCleanup(receiver.server_close)
+        self.addCleanup(receiver.shutdown)
+
+        simulator = Simulator(
+            api_secret_key=SECRET,
+            webhook_url=f"http://127.0.0.1:{receiver.server_address[1]}/webhooks",
+        )
+        with simulator.serve_in_thread() as api_url:
+            AuthsignalClient(SECRET, api_url).track("user-1", "signIn")
+            payload, signature = receiver.received.get(timeout=5)
+
+        event = Webhook(SECRET).construct_event(payload, signature)
+        self.assertEqual(event["type"], "action.created")
+        self.assertEqual(event["data"]["userId"], "user-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+import unittest
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .client import AuthsignalClient
+
+THREADS = 16
+ITERATIONS = 5
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    """Echoes each request back so callers can check they got their own reply."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.opened += 1
+            self.server.live += 1
+
+    def finish(self):
+        super().finish()
+        with self.server.lock:
+            self.server.live -= 1
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        url = urllib.parse.urlsplit(self.path)
+        echo = {
+            "method": self.command,
+            "path": url.path,
+            "query": url.query,
+            "body": body,
+            "cookie": self.headers.get("Cookie"),
+        }
+        if self.command == "GET" and url.path.endswith("/authenticators"):
+            echo = [echo]
+
+        payload = json.dumps(echo).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Set-Cookie", f"route={url.path}; Path=/")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSharedClientStress(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.opened = 0
+        self.server.live = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _exercise(self, client, worker):
+        """Calls every client method with ids unique to this worker and call."""
+        for i in range(ITERATIONS):
+            user_id = f"user-{worker}-{i}"
+            prefix = f"/v1/users/{user_id}"
+
+            response = client.track(user_id, "signIn", {"marker": user_id})
+            self.assertEqual(response["path"], f"{prefix}/actions/signIn")
+            self.assertEqual(response["body"], {"marker": user_id})
+            self.assertIsNone(response["cookie"])
+
+            self.assertEqual(client.get_user(user_id)["path"], prefix)
+
+            response = client.update_user(user_id, {"marker": user_id})
+            self.assertEqual(response["method"], "PATCH")
+            self.assertEqual(response["body"], {"marker": user_id})
+
+            self.assertIsNone(client.delete_user(user_id))
+
+            response = client.query_users(email=f"{user_id}@example.com")
+            self.assertEqual(response["query"], f"email={user_id}%40example.com")
+
+            response = client.get_authenticators(user_id)
+            self.assertEqual(response[0]["path"], f"{prefix}/authenticators")
+
+            response = client.enroll_verified_authenticator(user_id, {"marker": user_id})
+            self.assertEqual(response["body"], {"marker": user_id})
+
+            self.assertIsNone(client.delete_authenticator(user_id, f"auth-{i}"))
+
+            response = client.validate_challenge({"token": user_id})
+            self.assertEqual(response["path"], "/v1/validate")
+            self.assertEqual(response["body"], {"token": user_id})
+
+            response = client.get_action(user_id, "signIn", f"key-{i}")
+            self.assertEqual(response["path"], f"{prefix}/actions/signIn/key-{i}")
+
+            response = client.update_action(
+                user_id, "signIn", f"key-{i}", {"state": "ALLOW"}
+            )
+            self.assertEqual(response["body"], {"state": "ALLOW"})
+        return worker
+
+    def _hammer(self, client):
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            futures = [
+                pool.submit(self._exercise, client, worker) for worker in range(THREADS)
+            ]
+            finished = sorted(future.result(timeout=60) for future in futures)
+        self.assertEqual(finished, list(range(THREADS)))
+
+    def _wait_for_live_connections(self, limit):
+        deadline = time.monotonic() + 10
+        while self.server.live > limit and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.server.live
+
+    def test_no_cross_talk_or_lost_responses(self):
+        client = AuthsignalClient(
+            "secret", self.api_url, timeout=10, pool_maxsize=THREADS
+        )
+
+        self._hammer(client)
+
+        self.assertEqual(len(client.session.cookies), 0)
+        self.assertLessEqual(self._wait_for_live_connections(THREADS), THREADS)
+
+    def test_blocking_pool_never_exceeds_maxsize(self):
+        client = AuthsignalClient(
+            "secret", self.api_url, timeout=10, pool_maxsize=4, pool_block=True
+        )
+
+        self._hammer(client)
+
+        self.assertLessEqual(self.server.opened, 4)
+
+    def test_overflow_connections_are_released(self):
+        client = AuthsignalClient("secret", self.api_url, timeout=10, pool_maxsize=4)
+
+        self._hammer(client)
+
+        self.assertLessEqual(self._wait_for_live_connections(4), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,50 +2,299 @@ import hmac
 import hashlib
 import base64
 import json
+import math
+import threading
 import time
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Mapping, Optional, Sequence, Set, Union
 
 DEFAULT_TOLERANCE = 5  # minutes
+DEFAULT_BUCKET_SECONDS = 10
 VERSION = "v2"
+REPLAY_KEYS = ("signature", "id")
 
 class InvalidSignatureError(Exception):
     pass
 
+class ReplayedEventError(InvalidSignatureError):
+    pass
+
+class PayloadTooLargeError(InvalidSignatureError):
+    pass
+
+class ReplayStore:
+    """Remembers webhooks that were already accepted until they expire.
+
+    Implementations must make add atomic: of several concurrent calls with the
+    same key before it expires, exactly one may return True.
+    """
+
+    def add(self, key: str, expires_at: float) -> bool:
+        """Records key until expires_at (epoch seconds); False if it is already recorded."""
+        raise NotImplementedError
+
+class InMemoryReplayStore(ReplayStore):
+    """A per-process store with O(1) add and check and memory bounded by the tolerance window.
+
+    Keys live in a dict for lookup and in a ring of time buckets for expiry.
+    Each add first evicts the buckets whose time has fully passed, so only
+    keys that are still inside the window are retained.
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = DEFAULT_TOLERANCE * 60,
+        bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._slots: List[Set[str]] = [set() for _ in range(math.ceil(window_seconds / bucket_seconds) + 2)]
+        self._expires_at: Dict[str, float] = {}
+        self._evicted_through: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._expires_at)
+
+    def add(self, key: str, expires_at: float) -> bool:
+        with self._lock:
+            now = self._clock()
+            self._evict(now)
+            current = self._expires_at.get(key)
+            if current is not None and current > now:
+                return False
+            self._expires_at[key] = expires_at
+            self._slot_for(expires_at, now).add(key)
+            return True
+
+    def _bucket(self, t: float) -> int:
+        return int(t // self.bucket_seconds)
+
+    def _slot_for(self, expires_at: float, now: float) -> Set[str]:
+        # Keys expiring beyond the ring's horizon park in its last bucket and
+        # are moved forward again when that bucket is evicted.
+        horizon = self._bucket(now) + len(self._slots) - 1
+        return self._slots[min(self._bucket(expires_at), horizon) % len(self._slots)]
+
+    def _evict(self, now: float) -> None:
+        last_expired = self._bucket(now) - 1
+        if self._evicted_through is None:
+            self._evicted_through = last_expired
+            return
+        first = max(self._evicted_through + 1, last_expired - len(self._slots) + 1)
+        for bucket in range(first, last_expired + 1):
+            slot = self._slots[bucket % len(self._slots)]
+            self._slots[bucket % len(self._slots)] = set()
+            for key in slot:
+                expires_at = self._expires_at.get(key)
+                if expires_at is None:
+                    continue
+                if expires_at <= now:
+                    del self._expires_at[key]
+                else:
+                    self._slot_for(expires_at, now).add(key)
+        self._evicted_through = max(self._evicted_through, last_expired)
+
+class RedisReplayStore(ReplayStore):
+    """A store shared between processes, backed by a redis-py compatible client."""
+
+    def __init__(self, client, prefix: str = "authsignal:webhook:"):
+        self.client = client
+        self.prefix = prefix
+
+    def add(self, key: str, expires_at: float) -> bool:
+        ttl = max(1, math.ceil(expires_at - time.time()))
+        return bool(self.client.set(self.prefix + key, 1, nx=True, ex=ttl))
+
 class Webhook:
-    def __init__(self, api_secret_key: str):
+    def __init__(
+        self,
+        api_secret_key: Union[str, Sequence[str], Mapping[Any, str]],
+        replay_store: Optional[ReplayStore] = None,
+        replay_key: str = "signature",
+    ):
+        """
+        Args:
+            api_secret_key: Your Authsignal Secret API key of your tenant. To
+                rotate keys, pass every active key as a list (identified by
+                position) or a dict of key id to secret.
+            replay_store: Optional ReplayStore. When set, construct_event rejects
+                webhooks that were already accepted with ReplayedEventError.
+                Replays are only remembered for the tolerance window, so a
+                positive tolerance is required.
+            replay_key: What identifies a duplicate: "signature" rejects replays
+                of the same delivery, "id" also rejects redeliveries of the
+                same event.
+        """
+        if replay_key not in REPLAY_KEYS:
+            raise ValueError(f"replay_key must be one of {', '.join(REPLAY_KEYS)}")
+        if isinstance(api_secret_key, str):
+            secrets = {0: api_secret_key}
+        elif isinstance(api_secret_key, Mapping):
+            secrets = dict(api_secret_key)
+        else:
+            secrets = dict(enumerate(api_secret_key))
+        if not secrets:
+            raise ValueError("api_secret_key must contain at least one secret")
+
         self.api_secret_key = api_secret_key
+        self.replay_store = replay_store
+        self.replay_key = replay_key
+        # Keyed HMAC states are built once and copied for every verification.
+        self._keys = [
+            (key_id, hmac.new(secret.encode(), digestmod=hashlib.sha256))
+            for key_id, secret in secrets.items()
+        ]
+        self._preferred = 0
+        self.match_counts: Dict[Any, int] = {key_id: 0 for key_id in secrets}
+        # A Webhook is usually shared by request threads; the counts are what
+        # tells you a key can be retired, so no increment may be lost.
+        self._lock = threading.Lock()
 
     def construct_event(self, payload: str, signature: str, tolerance: int = DEFAULT_TOLERANCE) -> Dict[str, Any]:
-        parsed_signature = self.parse_signature(signature)
-        seconds_since_epoch = int(time.time())
+        verifier = self.verifier(signature, tolerance=tolerance)
+        verifier.update(payload.encode())
+        return verifier.finish()
 
-        if tolerance > 0 and parsed_signature["timestamp"] < seconds_since_epoch - tolerance * 60:
-            raise InvalidSignatureError("Timestamp is outside the tolerance zone.")
+    def verifier(
+        self,
+        signature: str,
+        tolerance: int = DEFAULT_TOLERANCE,
+        max_body_size: Optional[int] = None,
+        content_length: Optional[int] = None,
+    ) -> "WebhookVerifier":
+        """Starts verifying a webhook whose body will arrive in chunks.
 
-        hmac_content = f"{parsed_signature['timestamp']}.{payload}"
-        computed_signature = base64.b64encode(
-            hmac.new(
-                self.api_secret_key.encode(),
-                hmac_content.encode(),
-                hashlib.sha256
-            ).digest()
-        ).decode().replace("=", "")
-
-        match = any(sig == computed_signature for sig in parsed_signature["signatures"])
-        if not match:
-            raise InvalidSignatureError("Signature mismatch.")
-
-        return json.loads(payload)
+        The signature header and timestamp are checked straight away, so a
+        forged or stale request is rejected before any of its body is read.
+        Args:
+            signature: The value of the X-Signature-V2 header.
+            tolerance: Maximum age of the signature timestamp in minutes.
+            max_body_size: Reject bodies larger than this many bytes. Optional.
+            content_length: The request's declared Content-Length, checked
+                against max_body_size up front. Optional.
+        """
+        return WebhookVerifier(self, signature, tolerance, max_body_size, content_length)
 
     def parse_signature(self, value: str) -> Dict[str, Any]:
         timestamp = -1
         signatures: List[str] = []
         for item in value.split(","):
             kv = item.split("=")
-            if kv[0] == "t":
-                timestamp = int(kv[1])
-            if kv[0] == VERSION:
-                signatures.append(kv[1])
+            try:
+                if kv[0] == "t":
+                    timestamp = int(kv[1])
+                if kv[0] == VERSION:
+                    signatures.append(kv[1])
+            except (IndexError, ValueError):
+                raise InvalidSignatureError("Signature format is invalid.")
         if timestamp == -1 or not signatures:
             raise InvalidSignatureError("Signature format is invalid.")
-        return {"timestamp": timestamp, "signatures": signatures} 
\ No newline at end of file
+        return {"timestamp": timestamp, "signatures": signatures} 
+
+class WebhookVerifier:
+    """Verifies a webhook signature incrementally over a chunked request body.
+
+    Created through Webhook.verifier. Feed the raw body bytes to update as they
+    arrive and call finish once the body is complete; the JSON is only parsed
+    after the signature has matched. Only the most recently matched secret is
+    hashed while streaming; the others are tried over the buffered body if it
+    doesn't match. After finish, matched_key identifies the secret that did.
+    """
+
+    def __init__(
+        self,
+        webhook: Webhook,
+        signature: str,
+        tolerance: int = DEFAULT_TOLERANCE,
+        max_body_size: Optional[int] = None,
+        content_length: Optional[int] = None,
+    ):
+        if webhook.replay_store is not None and tolerance <= 0:
+            # Without a maximum age a delivery stays valid forever, but the
+            # store can only remember it for a bounded time.
+            raise ValueError("Replay protection requires a positive tolerance.")
+        parsed_signature = webhook.parse_signature(signature)
+        now = int(time.time())
+
+        if tolerance > 0 and parsed_signature["timestamp"] < now - tolerance * 60:
+            raise InvalidSignatureError("Timestamp is outside the tolerance zone.")
+        if max_body_size is not None and content_length is not None and content_length > max_body_size:
+            raise PayloadTooLargeError("Payload exceeds the maximum size.")
+
+        self._webhook = webhook
+        self._timestamp = parsed_signature["timestamp"]
+        self._signatures = parsed_signature["signatures"]
+        self._tolerance = tolerance
+        self._max_body_size = max_body_size
+        self._size = 0
+        self._chunks: List[bytes] = []
+        self._prefix = f"{self._timestamp}.".encode()
+        self._key_index = webhook._preferred
+        self._hmac = webhook._keys[self._key_index][1].copy()
+        self._hmac.update(self._prefix)
+        self.matched_key: Any = None
+
+    def update(self, chunk: bytes) -> None:
+        if self._hmac is None:
+            raise ValueError("Webhook verification has already finished.")
+        self._size += len(chunk)
+        if self._max_body_size is not None and self._size > self._max_body_size:
+            self._hmac = None
+            self._chunks = []
+            raise PayloadTooLargeError("Payload exceeds the maximum size.")
+        self._hmac.update(chunk)
+        self._chunks.append(chunk)
+
+    def finish(self) -> Dict[str, Any]:
+        if self._hmac is None:
+            raise ValueError("Webhook verification has already finished.")
+        streamed, self._hmac = self._hmac, None
+
+        computed_signature = self._match(streamed)
+        matched_index = self._key_index
+        if computed_signature is None:
+            for index, (_, key) in enumerate(self._webhook._keys):
+                if index == self._key_index:
+                    continue
+                candidate = key.copy()
+                candidate.update(self._prefix)
+                for chunk in self._chunks:
+                    candidate.update(chunk)
+                computed_signature = self._match(candidate)
+                if computed_signature is not None:
+                    matched_index = index
+                    break
+        if computed_signature is None:
+            self._chunks = []
+            raise InvalidSignatureError("Signature mismatch.")
+
+        payload = self._chunks[0] if len(self._chunks) == 1 else b"".join(self._chunks)
+        self._chunks = []
+        event = json.loads(payload)
+        self._check_replay(event, computed_signature)
+
+        # Only accepted events count, so replaying a captured webhook can't
+        # keep an old key looking in use.
+        self.matched_key = self._webhook._keys[matched_index][0]
+        with self._webhook._lock:
+            self._webhook._preferred = matched_index
+            self._webhook.match_counts[self.matched_key] += 1
+        return event
+
+    def _match(self, mac) -> Optional[str]:
+        computed_signature = base64.b64encode(mac.digest()).decode().replace("=", "")
+        expected = computed_signature.encode()
+        if any(hmac.compare_digest(sig.encode(), expected) for sig in self._signatures):
+            return computed_signature
+        return None
+
+    def _check_replay(self, event: Any, computed_signature: str) -> None:
+        replay_store = self._webhook.replay_store
+        if replay_store is None:
+            return
+        key = computed_signature
+        if self._webhook.replay_key == "id" and isinstance(event, dict) and event.get("id"):
+            key = f"id:{event['id']}"
+        if not replay_store.add(key, self._timestamp + self._tolerance * 60):
+            raise ReplayedEventError("Webhook has already been received.")
@@ -4,8 +4,17 @@ import base64
 import hmac
 import hashlib
 import json
+import threading
+from unittest.mock import patch
 
-from .webhook import Webhook, InvalidSignatureError
+from .webhook import (
+    Webhook,
+    InvalidSignatureError,
+    InMemoryReplayStore,
+    PayloadTooLargeError,
+    RedisReplayStore,
+    ReplayedEventError,
+)
 
 class TestWebhook(unittest.TestCase):
     def setUp(self):
@@ -103,5 +112,205 @@ class TestWebhook(unittest.TestCase):
         self.assertEqual(event["version"], 1)
         self.assertEqual(event["data"]["actionCode"], "accountRecovery")
 
+    def test_replayed_signature_is_rejected(self):
+        webhook = Webhook(self.secret, replay_store=InMemoryReplayStore())
+        signature = self.generate_signature(self.payload_valid_signature)
+
+        webhook.construct_event(self.payload_valid_signature, signature)
+        with self.assertRaises(ReplayedEventError) as cm:
+            webhook.construct_event(self.payload_valid_signature, signature)
+        self.assertIsInstance(cm.exception, InvalidSignatureError)
+        self.assertEqual(str(cm.exception), "Webhook has already been received.")
+
+    def test_replay_protection_requires_tolerance(self):
+        webhook = Webhook(self.secret, replay_store=InMemoryReplayStore())
+        signature = self.generate_signature(self.payload_valid_signature)
+
+        for tolerance in (0, -1):
+            with self.assertRaises(ValueError):
+                webhook.construct_event(self.payload_valid_signature, signature, tolerance=tolerance)
+
+    def test_redelivered_event_id_is_rejected(self):
+        webhook = Webhook(self.secret, replay_store=InMemoryReplayStore(), replay_key="id")
+
+        webhook.construct_event(self.payload_valid_signature, self.generate_signature(self.payload_valid_signature))
+        redelivery = self.generate_signature(self.payload_valid_signature, timestamp=self.timestamp + 30)
+        with self.assertRaises(ReplayedEventError):
+            webhook.construct_event(self.payload_valid_signature, redelivery)
+
+    def test_streaming_verification(self):
+        payload = self.payload_valid_signature.encode()
+        verifier = self.webhook.verifier(self.generate_signature(self.payload_valid_signature))
+
+        for i in range(0, len(payload), 7):
+            verifier.update(payload[i:i + 7])
+        event = verifier.finish()
+
+        self.assertEqual(event["data"]["actionCode"], "accountRecovery")
+        with self.assertRaises(ValueError):
+            verifier.finish()
+
+    def test_streaming_rejects_bad_header_before_body(self):
+        with self.assertRaises(InvalidSignatureError) as cm:
+            self.webhook.verifier("t=not-a-number,v2=abc")
+        self.assertEqual(str(cm.exception), "Signature format is invalid.")
+
+        with self.assertRaises(InvalidSignatureError) as cm:
+            self.webhook.verifier("t=1630000000,v2=abc")
+        self.assertEqual(str(cm.exception), "Timestamp is outside the tolerance zone.")
+
+    def test_streaming_rejects_oversize_body(self):
+        signature = self.generate_signature(self.payload_valid_signature)
+
+        with self.assertRaises(PayloadTooLargeError):
+            self.webhook.verifier(signature, max_body_size=10, content_length=11)
+
+        verifier = self.webhook.verifier(signature, max_body_size=10)
+        verifier.update(b"0123456789")
+        with self.assertRaises(PayloadTooLargeError):
+            verifier.update(b"x")
+
+    def test_streaming_does_not_parse_forged_payload(self):
+        forged = b"{not json"
+        verifier = self.webhook.verifier(self.generate_signature(self.payload_valid_signature))
+        verifier.update(forged)
+
+        with self.assertRaises(InvalidSignatureError) as cm:
+            verifier.finish()
+        self.assertEqual(str(cm.exception), "Signature mismatch.")
+
+    def test_non_ascii_signature_is_a_mismatch(self):
+        with self.assertRaises(InvalidSignatureError) as cm:
+            self.webhook.construct_event(self.payload_valid_signature, f"t={self.timestamp},v2=é")
+        self.assertEqual(str(cm.exception), "Signature mismatch.")
+
+    def test_rotated_secrets(self):
+        webhook = Webhook({"old": self.secret, "new": "NEW_SECRET"})
+        old_signature = self.generate_signature(self.payload_valid_signature)
+        new_signature = self.generate_signature(self.payload_valid_signature, secret="NEW_SECRET")
+
+        self.assertIsNotNone(webhook.construct_event(self.payload_valid_signature, new_signature))
+        verifier = webhook.verifier(old_signature)
+        verifier.update(self.payload_valid_signature.encode())
+        verifier.finish()
+
+        self.assertEqual(verifier.matched_key, "old")
+        self.assertEqual(webhook.match_counts, {"old": 1, "new": 1})
+
+        with self.assertRaises(InvalidSignatureError):
+            webhook.construct_event(
+                self.payload_valid_signature,
+                self.generate_signature(self.payload_valid_signature, secret="RETIRED"),
+            )
+
+    def test_last_matched_secret_is_tried_first(self):
+        webhook = Webhook(["OLD_SECRET", self.secret])
+        signature = self.generate_signature(self.payload_valid_signature)
+
+        with patch.object(hmac.HMAC, "copy", autospec=True, side_effect=hmac.HMAC.copy) as copy:
+            webhook.construct_event(self.payload_valid_signature, signature)
+            self.assertEqual(copy.call_count, 2)
+
+            copy.reset_mock()
+            webhook.construct_event(self.payload_valid_signature, signature)
+            self.assertEqual(copy.call_count, 1)
+
+    def test_replayed_event_is_not_counted(self):
+        webhook = Webhook({"old": self.secret, "new": "NEW_SECRET"}, replay_store=InMemoryReplayStore())
+        signature = self.generate_signature(self.payload_valid_signature)
+
+        webhook.construct_event(self.payload_valid_signature, signature)
+        for _ in range(3):
+            with self.assertRaises(ReplayedEventError):
+                webhook.construct_event(self.payload_valid_signature, signature)
+
+        self.assertEqual(webhook.match_counts, {"old": 1, "new": 0})
+
+    def test_match_counts_are_thread_safe(self):
+        webhook = Webhook({"old": "OLD_SECRET", "new": self.secret})
+        signature = self.generate_signature(self.payload_valid_signature)
+
+        def verify():
+            for _ in range(200):
+                webhook.construct_event(self.payload_valid_signature, signature)
+
+        threads = [threading.Thread(target=verify) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(webhook.match_counts, {"old": 0, "new": 1600})
+
+    def test_no_secrets(self):
+        with self.assertRaises(ValueError):
+            Webhook([])
+
+    def test_invalid_replay_key(self):
+        with self.assertRaises(ValueError):
+            Webhook(self.secret, replay_key="body")
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class TestInMemoryReplayStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(1_000_000)
+        self.store = InMemoryReplayStore(window_seconds=300, bucket_seconds=10, clock=self.clock)
+
+    def test_add_and_expire(self):
+        self.assertTrue(self.store.add("a", self.clock.now + 300))
+        self.assertFalse(self.store.add("a", self.clock.now + 300))
+
+        self.clock.now += 301
+        self.assertTrue(self.store.add("a", self.clock.now + 300))
+
+    def test_memory_is_bounded_by_window(self):
+        for i in range(1000):
+            self.clock.now += 1
+            self.store.add(f"key-{i}", self.clock.now + 300)
+        self.assertLessEqual(len(self.store), 300 + self.store.bucket_seconds)
+
+    def test_expiry_beyond_window_is_kept(self):
+        self.store.add("long", self.clock.now + 3600)
+
+        self.clock.now += 1800
+        self.assertFalse(self.store.add("long", self.clock.now + 300))
+
+        self.clock.now += 1801
+        self.assertTrue(self.store.add("long", self.clock.now + 300))
+
+    def test_large_clock_jump_clears_everything(self):
+        for i in range(10):
+            self.store.add(f"key-{i}", self.clock.now + 300)
+
+        self.clock.now += 86400
+        self.store.add("new", self.clock.now + 300)
+        self.assertEqual(len(self.store), 1)
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, name, value, nx=False, ex=None):
+        if nx and name in self.values:
+            return None
+        self.values[name] = (value, ex)
+        return True
+
+class TestRedisReplayStore(unittest.TestCase):
+    def test_add_uses_set_nx_with_ttl(self):
+        redis = FakeRedis()
+        store = RedisReplayStore(redis)
+
+        self.assertTrue(store.add("sig", time.time() + 120))
+        self.assertFalse(store.add("sig", time.time() + 120))
+        _, ttl = redis.values["authsignal:webhook:sig"]
+        self.assertIn(ttl, (120, 121))
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
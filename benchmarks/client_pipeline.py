@@ -0,0 +1,70 @@
+"""Measures the client's own CPU cost per call by replaying a recorded cassette.
+
+Records a short session against the local simulator, then replays it at
+memory speed so the numbers exclude network variance. Run from the repository
+root with:
+
+    python -m benchmarks.client_pipeline [--calls N] [--latency-scale X]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from authsignal import AuthsignalClient
+from authsignal.cassette import RecordingAdapter, ReplayAdapter
+from authsignal.client import ApiException
+from authsignal.simulator import Simulator
+
+SECRET = "benchmark-secret"
+
+
+def record(path):
+    with Simulator(api_secret_key=SECRET).serve_in_thread() as api_url:
+        recorder = RecordingAdapter(path)
+        client = AuthsignalClient(SECRET, api_url, transport=recorder)
+        client.update_user("user-1", {"email": "one@example.com", "displayName": "One"})
+        client.track("user-1", "signIn", {"email": "one@example.com"})
+        try:
+            client.get_action("user-1", "signIn", "missing-key")
+        except ApiException:
+            pass
+        recorder.save()
+    return api_url
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--latency-scale", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "pipeline.cassette.gz")
+        api_url = record(path)
+        client = AuthsignalClient(
+            SECRET, api_url, transport=ReplayAdapter(path, latency_scale=args.latency_scale)
+        )
+
+        calls = {"ok": 0, "error": 0}
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        for _ in range(args.calls // 3):
+            client.update_user("user-1", {"email": "one@example.com", "displayName": "One"})
+            client.track("user-1", "signIn", {"email": "one@example.com"})
+            calls["ok"] += 2
+            try:
+                client.get_action("user-1", "signIn", "missing-key")
+            except ApiException:
+                calls["error"] += 1
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+
+    total = calls["ok"] + calls["error"]
+    print(f"{total} replayed calls ({calls['error']} errors)")
+    print(f"{total / elapsed:,.0f} calls/s, {cpu / total * 1e6:,.1f} us CPU/call")
+
+
+if __name__ == "__main__":
+    main()
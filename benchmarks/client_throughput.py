@@ -0,0 +1,40 @@
+"""Measures client throughput against the local simulator.
+
+Run from the repository root with:
+    python -m benchmarks.client_throughput [threads] [requests] [latency_ms]
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from authsignal import AuthsignalClient
+from authsignal.simulator import Simulator
+
+SECRET = "benchmark-secret"
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.0
+
+    with Simulator(api_secret_key=SECRET, latency=latency).serve_in_thread() as api_url:
+        client = AuthsignalClient(SECRET, api_url, timeout=10, pool_maxsize=threads)
+
+        def call(i):
+            return client.track(f"user-{i % 100}", "signIn", {"email": f"user-{i}@example.com"})
+
+        call(0)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for _ in pool.map(call, range(total)):
+                pass
+        elapsed = time.perf_counter() - start
+
+    print(f"{total} track calls, {threads} threads, {latency * 1000:.0f} ms latency")
+    print(f"{total / elapsed:,.0f} requests/s, {elapsed / total * 1e6:,.0f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Measures the per-call cost of API errors surfacing as ApiException.
+
+Responses come from an in-memory transport, so only the client's own work
+(status checking, error body decoding, building and raising the exception) is
+timed. trust_env is switched off so requests' per-call proxy and netrc lookups
+in the environment don't drown it out. Run from the repository root with:
+
+    python -m benchmarks.error_path [calls]
+"""
+
+import datetime
+import json
+import sys
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from authsignal import AuthsignalClient
+from authsignal.client import ApiException
+
+API_URL = "http://benchmark.invalid/v1"
+
+SCENARIOS = {
+    "200 ok": (200, {"userId": "user-1", "email": "user-1@example.com"}),
+    "400 validation": (400, {"errorCode": "invalid_request", "errorDescription": "email is invalid"}),
+    "401 auth": (401, {"errorCode": "unauthorized", "errorDescription": "The request is unauthorized."}),
+    "429 rate limited": (429, {"errorCode": "too_many_requests", "errorDescription": "Slow down."}),
+    "502 no body": (502, None),
+}
+
+
+class StaticAdapter(BaseAdapter):
+    def __init__(self, status, body):
+        super().__init__()
+        self.status = status
+        self.content = json.dumps(body).encode() if body is not None else b"Bad Gateway"
+        self.headers = {"Content-Type": "application/json" if body is not None else "text/plain"}
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(0)
+        return response
+
+    def close(self):
+        pass
+
+
+def per_call_us(fn, calls):
+    start = time.process_time()
+    for _ in range(calls):
+        try:
+            fn()
+        except ApiException:
+            pass
+    return (time.process_time() - start) / calls * 1e6
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print(f"{'':<18} {'send':>10} {'full call':>10}   (us CPU/call)")
+    for name, (status, body) in SCENARIOS.items():
+        client = AuthsignalClient("secret", API_URL, transport=StaticAdapter(status, body))
+        client.session.trust_env = False
+        # send() on a request prepared once isolates response and error
+        # handling from building the request.
+        prepared = client.session.prepare_request(requests.Request("GET", f"{API_URL}/users/user-1"))
+
+        send = per_call_us(lambda: client.session.send(prepared), calls)
+        full = per_call_us(lambda: client.get_user("user-1"), calls)
+        print(f"{name:<18} {send:>10.1f} {full:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Reports what importing the package costs, using `python -X importtime`.
+
+Run from the repository root with: python -m benchmarks.import_time [repeats]
+"""
+
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    "webhook only": "from authsignal import Webhook",
+    "client": "from authsignal import AuthsignalClient",
+}
+
+
+def import_times(statement):
+    """Returns {module: self-time in microseconds} for one interpreter run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(self_us)
+    return times
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline = set(import_times("pass"))
+
+    for name, statement in SCENARIOS.items():
+        totals = []
+        for _ in range(repeats):
+            times = import_times(statement)
+            added = {m: t for m, t in times.items() if m not in baseline}
+            totals.append(sum(added.values()))
+
+        slowest = sorted(added.items(), key=lambda item: item[1], reverse=True)[:5]
+        print(f"{name:<14} {statistics.median(totals) / 1000:>8.1f} ms over {len(added)} modules")
+        for module, self_us in slowest:
+            print(f"    {module:<30} {self_us / 1000:>6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
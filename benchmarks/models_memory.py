@@ -0,0 +1,56 @@
+"""Compares the memory and build time of typed models against decamelized dicts.
+
+Run from the repository root with: python -m benchmarks.models_memory [count]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import humps
+
+from authsignal.models import QueryUsersResponse
+
+
+def make_payload(count):
+    return {
+        "users": [
+            {
+                "userId": f"user-{i}",
+                "email": f"user-{i}@example.com",
+                "emailVerified": True,
+                "phoneNumber": f"+6421{i:07d}",
+                "phoneNumberVerified": False,
+                "username": f"user{i}",
+                "displayName": f"User {i}",
+                "isEnrolled": True,
+                "enrolledVerificationMethods": ["EMAIL_OTP"],
+            }
+            for i in range(count)
+        ],
+        "lastEvaluatedUserId": f"user-{count - 1}",
+    }
+
+
+def measure(name, build, payload):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(payload)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<20} {current / 1024:>10.1f} KiB {elapsed * 1000:>10.2f} ms")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    payload = make_payload(count)
+
+    print(f"{count} users")
+    measure("decamelized dict", humps.decamelize, payload)
+    measure("typed models", QueryUsersResponse.from_json, payload)
+
+
+if __name__ == "__main__":
+    main()